@@ -0,0 +1,8 @@
+from typing import Optional
+
+
+class AJSONError(ValueError):
+    # lexer & syntax errors: offset in the input they were raised for, None if unknown
+    def __init__(self, message: str, offset: Optional[int] = None):
+        super().__init__(message)
+        self.offset = offset
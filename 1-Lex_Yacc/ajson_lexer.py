@@ -1,11 +1,38 @@
 import os
+import mmap
 from decimal import Decimal
-import ply.lex as lex
+from typing import Optional, Tuple, Union
+from ply.lex import LexToken
+from ajson_tables import build_lexer
+from ajson_scanner import AJSONScanner
+from ajson_tokens import AJSONTokenBuffer
+from ajson_source import AJSONSourceLexer
+from ajson_lines import AJSONLineIndex
+from ajson_errors import AJSONError
+
+# SCIENTIFIC literals: exact = Decimal || fast = float
+NUMBERS = os.environ.get("AJSON_NUMBERS", "exact")
 
 
 class AJSONLexer:
-    def __init__(self):
-        self.lexer = lex.lex(module=self)
+    def __init__(self, engine: str = "ply", numbers: str = NUMBERS):
+        # ERROR HANDLING
+        if engine not in ["ply", "scanner"]:
+            raise ValueError(f"INCORRECT LEXER ENGINE:\n"
+                f"# PROVIDED: {engine}\n"
+                f"# EXPECTED: ply || scanner")
+        if numbers not in ["exact", "fast"]:
+            raise ValueError(f"INCORRECT NUMERIC POLICY:\n"
+                f"# PROVIDED: {numbers}\n"
+                f"# EXPECTED: exact || fast")
+
+        self.numbers = numbers
+        self.__scientific = Decimal if numbers == "exact" else float
+        self.__lines = None  # line index of the last input located
+        self.lexer = build_lexer(self)
+        self.source = AJSONSourceLexer(self)  # same rules over memory-mapped files
+        if engine == "scanner":  # same rules, one compiled scanner instead of PLY's token loop
+            self.lexer = AJSONScanner(self)
     
     # DEFINE LITERALS
     literals = ['{', '}', '[', ']', ':', ',']
@@ -35,7 +62,7 @@ class AJSONLexer:
 
     def t_SCIENTIFIC(self, t):
         r'\-?([1-9]\d*|0)?(\.\d+)?[eE]\-?([1-9]\d*|0)'
-        t.value = Decimal(t.value)
+        t.value = self.__scientific(t.value)  # arbitrary precision || float
         return t
 
     def t_REAL(self, t):
@@ -81,14 +108,50 @@ class AJSONLexer:
 
     def t_newline(self, t):
         r'\n|\r\n?'
-        t.lexer.lineno = t.value.count(os.linesep)
+        t.lexer.lineno += 1
 
     # ERROR HANDLING
     def t_error(self, t):
-        raise ValueError(f"[ERROR][LEXER]: Illegal character:\n"
-            f"# PROVIDED: {t.value[0]}")
+        raise AJSONError(f"[ERROR][LEXER]: Illegal character:\n"
+            f"# PROVIDED: {t.value[0]}", t.lexpos)
 
     # RUN
-    def tokenize(self, data: str) -> str:
-        self.lexer.input(data)
-        return "\n".join([f"{t.type} {t.value}" for t in self.lexer])
\ No newline at end of file
+    def tokenize(self, data: Union[str, mmap.mmap, bytes]) -> str:
+        lexer = self.lexer if isinstance(data, str) else self.source  # or memory-mapped source
+        lexer.lineno = 1
+        lexer.input(data)
+        try:
+            if isinstance(lexer, AJSONScanner):  # plain tuples, no token objects
+                return "\n".join([f"{type} {value}" for type, value, _, _ in lexer.scan()])
+            return "\n".join([f"{t.type} {t.value}" for t in lexer])
+        except ValueError as e:
+            raise self.located(e, data) from None
+
+    def buffer(self, data: Union[str, mmap.mmap, bytes]) -> AJSONTokenBuffer:
+        # compact token columns instead of one LexToken per token
+        try:
+            return AJSONTokenBuffer(self, data)
+        except ValueError as e:
+            raise self.located(e, data) from None
+
+    # POSITIONS
+    def lines(self, data: Union[str, mmap.mmap, bytes]) -> AJSONLineIndex:
+        # line index of `data`, built once per input
+        if self.__lines is None or self.__lines.data is not data:
+            self.__lines = AJSONLineIndex(data)
+        return self.__lines
+
+    def location(self, data: Union[str, mmap.mmap, bytes], t: LexToken) -> Tuple[int, int]:
+        # (line, column) of a token lexed from `data`
+        return self.lines(data).position(t.lexpos)
+
+    def located(self, error: ValueError, data: Union[str, mmap.mmap, bytes], offset: Optional[int] = None) -> ValueError:
+        # error with the line & column of `offset` in `data`, its own offset by default, as it is without offset
+        if offset is None:
+            offset = getattr(error, "offset", None)
+        if offset is None:
+            return error
+        line, column = self.lines(data).position(offset)
+        if isinstance(error, AJSONError):  # same kind of error, offset in `data`
+            return AJSONError(f"{error}\n# POSITION: line {line}, column {column}", offset)
+        return ValueError(f"{error}\n# POSITION: line {line}, column {column}")
\ No newline at end of file
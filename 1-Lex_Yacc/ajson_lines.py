@@ -0,0 +1,41 @@
+import re
+import sys
+import mmap
+from array import array
+from bisect import bisect_right
+from typing import Tuple, Union
+
+# offset of errors at the end of the input, whatever its length
+END = sys.maxsize
+# line breaks of the lexer: \n, \r\n & \r, in text & byte sources
+BREAKS = {str: re.compile(r"\r\n?|\n"), bytes: re.compile(rb"\r\n?|\n")}
+
+
+class AJSONLineIndex:
+    def __init__(self, data: Union[str, mmap.mmap, bytes]):
+        # offset where each line starts, one pass over the source: positions by binary search
+        self.data = data
+        self.starts = array('q', [0])
+        newline = "\n" if isinstance(data, str) else b"\n"
+        if data.find("\r" if isinstance(data, str) else b"\r") == -1:
+            pos = data.find(newline)
+            while pos != -1:
+                self.starts.append(pos + 1)
+                pos = data.find(newline, pos + 1)
+        else:  # carriage returns: only in sources not opened by open_source
+            self.starts.extend(match.end() for match in BREAKS[str if isinstance(data, str) else bytes].finditer(data))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line(self, offset: int) -> int:
+        return bisect_right(self.starts, min(offset, len(self.data)))
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        # (line, column) from 1 of an offset, characters also in byte sources
+        offset = min(offset, len(self.data))
+        line = self.line(offset)
+        start = self.starts[line - 1]
+        if isinstance(self.data, str):
+            return (line, offset - start + 1)
+        return (line, len(self.data[start:offset].decode("UTF-8", "replace")) + 1)
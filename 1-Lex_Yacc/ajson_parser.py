@@ -1,13 +1,38 @@
-from typing import Union
-import ply.yacc as yacc
-from ajson_lexer import AJSONLexer
+import sys
+import mmap
+import operator
+from decimal import Decimal
+from typing import Any, Callable, Iterator, TextIO, Union
+from ajson_lexer import AJSONLexer, NUMBERS
+from ajson_tokens import AJSONTokenBuffer
+from ajson_tables import build_parser
+from ajson_lines import END
+from ajson_errors import AJSONError
+
+
+def _comparator(function: Callable, left: type, right: type) -> Callable:
+    # SCIENTIFIC numbers are Decimal: compared as the float they read as
+    if left is Decimal and right is Decimal:
+        return lambda a, b: function(float(a), float(b))
+    if left is Decimal:
+        return lambda a, b: function(float(a), b)
+    if right is Decimal:
+        return lambda a, b: function(a, float(b))
+    return function
+
+
+# (comparator, left number type, right number type) -> function
+COMPARATORS = {(comparator, left, right): _comparator(function, left, right)
+    for comparator, function in {"==": operator.eq, ">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt}.items()
+    for left in [int, float, Decimal] for right in [int, float, Decimal]}
 
 
 class AJSONParser:
-    def __init__(self):
-        self.parser = yacc.yacc(module=self)
+    def __init__(self, engine: str = "ply", numbers: str = NUMBERS):
+        self.lexer = AJSONLexer(engine, numbers)
+        self.parser = build_parser(self)
 
-    tokens = AJSONLexer().tokens
+    tokens = AJSONLexer.tokens
 
     # DEFINE PRODUCTION RULES
     def p_file(self, p):
@@ -25,13 +50,23 @@ class AJSONParser:
 
     def p_object_content(self, p):
         """
-        object_content : object_entry ',' object_content
-            | object_entry
+        object_content : object_entries
+            | object_entries ','
             | empty
         """
-        p[0] = None if p[1] is None else dict([p[1]])
-        if len(p) == 4 and p[3] is not None:
-            p[0].update(p[3])
+        p[0] = p[1]
+
+    def p_object_entries(self, p):
+        """
+        object_entries : object_entries ',' object_entry
+            | object_entry
+        """
+        # left recursion: entries are added to a single dict as they are reduced
+        if len(p) == 4:
+            p[0] = p[1]
+            p[0][p[3][0]] = p[3][1]
+        else:
+            p[0] = dict([p[1]])
 
     def p_object_entry(self, p):
         """
@@ -67,19 +102,29 @@ class AJSONParser:
 
     def p_array_content(self, p):
         """
-        array_content : object ',' array_content
-            | object
+        array_content : array_items
+            | array_items ','
             | empty
         """
-        p[0] = [] if p[1] is None else [p[1]]
-        if len(p) == 4 and p[3] is not None:
-            p[0].extend(p[3])
+        p[0] = [] if p[1] is None else p[1]
+
+    def p_array_items(self, p):
+        """
+        array_items : array_items ',' object
+            | object
+        """
+        # left recursion: items are appended to a single list as they are reduced
+        if len(p) == 4:
+            p[0] = p[1]
+            p[0].append(p[3])
+        else:
+            p[0] = [p[1]]
 
     def p_comparison(self, p):
         """
         comparison : number COMPARATOR number
         """
-        p[0] = eval(f"{p[1]} {p[2]} {p[3]}")
+        p[0] = self.compare(p[1], p[2], p[3])
 
     def p_number(self, p):
         """
@@ -98,31 +143,49 @@ class AJSONParser:
         """
         pass
 
+    # AUXILAR METHODS
+    def compare(self, left: Any, comparator: str, right: Any) -> bool:
+        return COMPARATORS[comparator, type(left), type(right)](left, right)
+
     # ERROR HANDLING
     def p_error(self, p):
         p_value = None if p is None else p.value
-        raise ValueError(f"[ERROR][PARSER]: Not matching production rule:\n"
-            f"# PROVIDED: {p_value}")
+        raise AJSONError(f"[ERROR][PARSER]: Not matching production rule:\n"
+            f"# PROVIDED: {p_value}", END if p is None else p.lexpos)
 
     # RUN
-    def parse(self, data: str) -> str:
-        data = self.parser.parse(data)
-        output = self.__output(data)
-        return None if output is None else output[:-1]
-    
-    def __output(self, data: Union[dict, None], parent_key=""):
-        if data is None:
-            return None
-        output = ""
-        for key, value in data.items():
-            if isinstance(value, dict):
-                output += self.__output(value, f"{parent_key}.{key}" if parent_key else key)
-            elif isinstance(value, list):
-                for index, item in enumerate(value):
-                    output += self.__output(item, f"{parent_key}.{key}.{index}" if parent_key else f"{key}.{index}")
+    def load(self, data: Union[str, mmap.mmap, bytes, AJSONTokenBuffer]) -> Union[dict, None]:
+        # lexer & syntax errors located in the source: line & column
+        self.lexer.lexer.lineno = 1
+        try:
+            if isinstance(data, AJSONTokenBuffer):  # already tokenized
+                return self.parser.parse(lexer=data.rewind())
+            if isinstance(data, str):
+                return self.parser.parse(data, lexer=self.lexer.lexer)
+            return self.parser.parse(data, lexer=self.lexer.source)  # memory-mapped source
+        except ValueError as e:
+            raise self.lexer.located(e, data.data if isinstance(data, AJSONTokenBuffer) else data) from None
+
+    def parse(self, data: Union[str, mmap.mmap, bytes]) -> Union[str, None]:
+        data = self.load(data)
+        return None if data is None else "\n".join(self.flatten(data))
+
+    def write(self, data: dict, file: TextIO = sys.stdout):
+        file.writelines(f"{line}\n" for line in self.flatten(data))
+
+    def flatten(self, data: dict) -> Iterator[str]:
+        # iterative depth-first walk: one line at a time, memory bounded by nesting depth
+        stack = [("", iter(data.items()))]
+        while stack:
+            parent_key, items = stack[-1]
+            for key, value in items:
+                key = f"{parent_key}.{key}" if parent_key else key
+                if isinstance(value, dict):
+                    stack.append((key, iter(value.items())))
+                    break
+                if isinstance(value, list):
+                    stack.append((key, enumerate(value)))
+                    break
+                yield f"{{ {key}: {value} }}"
             else:
-                if parent_key:
-                    output += f"{{ {parent_key}.{key}: {value} }}\n"
-                else:
-                    output += f"{{ {key}: {value} }}\n"
-        return output
\ No newline at end of file
+                stack.pop()
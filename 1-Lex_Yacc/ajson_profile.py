@@ -0,0 +1,122 @@
+import time
+import json
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, List
+
+# phase of a disabled profiler: one shared context, nothing measured
+NO_PHASE = nullcontext()
+
+
+class AJSONProfiler:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases = {}  # name -> [calls, seconds, peak bytes]
+        self.productions = {}  # rule function & production -> [calls, seconds]
+        self.tokens = {}  # token type -> [calls, seconds]
+        self.peak = 0
+
+    # RUN
+    def start(self):
+        tracemalloc.start()
+
+    def stop(self):
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    def phase(self, name: str):
+        # wall time, calls & peak memory of a step: setup, parse, output...
+        return self.__phase(name) if self.enabled else NO_PHASE
+
+    @contextmanager
+    def __phase(self, name: str):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.phases.setdefault(name, [0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += elapsed
+            if tracing:
+                entry[2] = max(entry[2], tracemalloc.get_traced_memory()[1])
+
+    def instrument(self, analyzer: Any):
+        # time every grammar action & token of a lexer / parser, from now on
+        lexer = getattr(analyzer, "lexer", None)
+        if hasattr(analyzer, "parser"):  # AJSONParser: its LALR parser & its AJSONLexer
+            for production in analyzer.parser.productions:
+                if production.callable is not None:
+                    production.callable = self.__action(f"{production.func}: {production.str}", production.callable)
+            self.instrument(lexer)
+            return
+        for source in [lexer, getattr(analyzer, "source", None)]:  # text & memory-mapped lexers
+            if source is not None:
+                source.token = self.__token(source.token)
+
+    # REPORT
+    def report(self) -> Dict[str, Any]:
+        return {
+            "peak_bytes": self.peak,
+            "phases": {name: {"calls": calls, "seconds": seconds, "peak_bytes": peak}
+                for name, (calls, seconds, peak) in self.phases.items()},
+            "productions": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in _slowest(self.productions)},
+            "tokens": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in _slowest(self.tokens)}
+        }
+
+    def write(self, file_path: str):
+        with open(file_path, 'w', encoding="UTF-8") as file:
+            json.dump(self.report(), file, indent=2)
+
+    def summary(self, top: int = 15) -> str:
+        lines = [f">>> PROFILE: peak memory {self.peak / 2 ** 20:.1f} MiB (traced), parse includes tokens & actions"]
+        lines += [f"{'phase':<10} {seconds * 1000:10.2f} ms {calls:>9} calls  {name} (peak {peak / 2 ** 20:.1f} MiB)"
+            for name, (calls, seconds, peak) in self.phases.items()]
+        for title, entries in [("production", self.productions), ("token", self.tokens)]:
+            lines += [f"{title:<10} {seconds * 1000:10.2f} ms {calls:>9} calls  {name}"
+                for name, (calls, seconds) in _slowest(entries)[:top]]
+        return "\n".join(lines)
+
+    # AUXILAR METHODS
+    def __action(self, name: str, action: Callable) -> Callable:
+        entry = self.productions.setdefault(name, [0, 0.0])
+        clock = time.perf_counter
+
+        def timed(p):
+            start = clock()
+            try:
+                action(p)
+            finally:
+                entry[0] += 1
+                entry[1] += clock() - start
+        return timed
+
+    def __token(self, token: Callable) -> Callable:
+        tokens = self.tokens
+        clock = time.perf_counter
+
+        def timed():
+            start = clock()
+            t = token()
+            elapsed = clock() - start
+            if t is not None:
+                entry = tokens.get(t.type)
+                if entry is None:
+                    entry = tokens[t.type] = [0, 0.0]
+                entry[0] += 1
+                entry[1] += elapsed
+            return t
+        return timed
+
+
+def _slowest(entries: Dict[str, List]) -> List:
+    # entries called at least once, most time first
+    return sorted([entry for entry in entries.items() if entry[1][0]], key=lambda entry: entry[1][1], reverse=True)
+
+
+# profiler of analyzers not instrumented: phases cost one call
+OFF = AJSONProfiler(False)
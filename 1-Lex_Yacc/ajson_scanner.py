@@ -0,0 +1,108 @@
+import re
+import string
+from typing import Any, Iterator, Tuple
+
+
+class AJSONToken:
+    __slots__ = ("type", "value", "lineno", "lexpos", "lexer")
+
+    def __str__(self) -> str:
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class AJSONScanner:
+    def __init__(self, lexer: Any):
+        # first character -> (match, (rule function or None, token type) by group), one small
+        # compiled regex per character class built from the rules of `lexer`
+        self.__table = {}
+        for chars, names in self.classes.items():
+            regex = re.compile("|".join(f"(?P<{name}>{self.__pattern(lexer, name)})" for name in names), lexer.lexer.lexreflags)
+            actions = [None] * (regex.groups + 1)
+            for name, index in regex.groupindex.items():
+                rule = getattr(lexer, name)
+                actions[index] = (rule if callable(rule) else None, name[2:])
+            for char in chars:
+                self.__table[char] = (regex.match, actions)
+        self.__ignore = re.compile(f"[{re.escape(lexer.t_ignore)}]+").match
+        self.__literals = "".join(lexer.literals)
+        self.__error = lexer.t_error
+        self.input("")
+
+    # DEFINE CHARACTER CLASSES
+    # rules that can match from each first character, in the order PLY tries them
+    classes = {
+        string.digits + "-.": ["t_SCIENTIFIC", "t_REAL", "t_HEXADECIMAL", "t_OCTAL", "t_BINARY", "t_INTEGER"],
+        "eE": ["t_SCIENTIFIC", "t_STRING_IMPLICIT"],
+        string.ascii_letters.replace("e", "").replace("E", "") + "_": ["t_STRING_IMPLICIT"],
+        "\"": ["t_STRING_EXPLICIT"],
+        "\n\r": ["t_newline"],
+        "=<>": ["t_COMPARATOR"]
+    }
+
+    # PLY LEXER INTERFACE
+    def input(self, data: str):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lineno = 1
+        self.__stream = self.__tokens()
+
+    def token(self) -> AJSONToken:
+        return next(self.__stream, None)
+
+    def __iter__(self) -> Iterator[AJSONToken]:
+        return self.__stream
+
+    def __tokens(self) -> Iterator[AJSONToken]:
+        for type, value, lineno, lexpos in self.scan():
+            token = AJSONToken()
+            token.type = type
+            token.value = value
+            token.lineno = lineno
+            token.lexpos = lexpos
+            yield token
+
+    # RUN
+    def scan(self) -> Iterator[Tuple[str, Any, int, int]]:
+        # (type, value, lineno, lexpos) of every token from lexpos on
+        data = self.lexdata
+        table = self.__table
+        literals = self.__literals
+        token = AJSONToken()  # reused for token rules
+        token.lexer = self
+        pos = self.lexpos
+        while pos < len(data):
+            char = data[pos]
+            entry = table.get(char)
+            found = None if entry is None else entry[0](data, pos)
+            if found is not None:
+                rule, type = entry[1][found.lastindex]
+                self.lexpos = found.end()
+                if rule is None:  # string rule
+                    yield (type, found.group(), self.lineno, pos)
+                else:
+                    token.type, token.value, token.lineno, token.lexpos = type, found.group(), self.lineno, pos
+                    if rule(token) is not None:  # rules may drop the token
+                        yield (token.type, token.value, token.lineno, token.lexpos)
+                pos = self.lexpos  # or move lexpos
+            elif char in literals:
+                self.lexpos = pos + 1
+                yield (char, char, self.lineno, pos)
+                pos += 1
+            else:
+                ignored = self.__ignore(data, pos)
+                if ignored is None:
+                    self.lexpos = pos
+                    token.type, token.value, token.lineno, token.lexpos = "error", data[pos:], self.lineno, pos
+                    self.__error(token)
+                    pos = self.lexpos
+                else:
+                    pos = ignored.end()
+        self.lexpos = pos
+
+    # AUXILAR METHODS
+    def __pattern(self, lexer: Any, name: str) -> str:
+        rule = getattr(lexer, name)
+        return getattr(rule, "regex", rule.__doc__) if callable(rule) else rule
@@ -0,0 +1,163 @@
+from typing import Any, Iterable, Iterator, TextIO, Tuple
+from ply.lex import LexToken
+from ajson_parser import AJSONParser
+
+
+class AJSONStreamParser:
+    def __init__(self, chunk_size: int = 1 << 16):
+        self.parser = AJSONParser()
+        self.lexer = self.parser.lexer
+        self.chunk_size = chunk_size
+
+    # no token rule looks further than this past the end of its match
+    lookahead = 8
+
+    numbers = ["SCIENTIFIC", "REAL", "HEXADECIMAL", "OCTAL", "BINARY", "INTEGER"]
+    values = numbers + ["TR", "FL", "NULL", "STRING_EXPLICIT"]
+
+    # LEXER
+    def tokens(self, file: TextIO) -> Iterator[LexToken]:
+        # same rules as AJSONLexer, run chunk by chunk over the compiled PLY tables
+        lexer = self.lexer.lexer
+        lexer.lineno = 1
+        data, offset = "", 0
+        while True:
+            chunk = file.read(self.chunk_size)
+            eof = not chunk
+            data += chunk
+            pos = 0
+            while pos < len(data):
+                if data[pos] in lexer.lexignore:
+                    pos += 1
+                    continue
+                for regex, rules in lexer.lexre:
+                    match = regex.match(data, pos)
+                    if match:
+                        break
+                if match:
+                    if not eof and match.end() + self.lookahead >= len(data):
+                        break  # the token may go on in the next chunk
+                    rule, type = rules[match.lastindex]
+                    token = self.__token(type, match.group(), offset + pos)
+                    pos = match.end()
+                    if rule:
+                        token = rule(token)
+                    if token:
+                        yield token
+                elif data[pos] in lexer.lexliterals:
+                    yield self.__token(data[pos], data[pos], offset + pos)
+                    pos += 1
+                elif not eof and data.find("\n", pos) == -1:
+                    break  # tokens never span lines: wait for the rest of this one
+                else:
+                    lexer.lexerrorf(self.__token("error", data[pos:], offset + pos))
+            offset += pos
+            data = data[pos:]
+            if eof:
+                return
+
+    # PARSER
+    def events(self, file: TextIO) -> Iterator[Tuple[str, Any]]:
+        # pushdown automaton for the AJSONParser grammar, one event per construct
+        tokens = self.tokens(file)
+        containers = []  # open '{' / '['
+        state = "file"
+        token = next(tokens, None)
+        while True:
+            type = None if token is None else token.type
+            if state == "file" and type is None:
+                return
+            elif state in ["file", "value", "item"] and type == '{':
+                containers.append('{')
+                state = "key"
+                yield ("start_object", None)
+            elif state == "key" and type in ["STRING_EXPLICIT", "STRING_IMPLICIT"]:
+                state = ":"
+                yield ("key", token.value)
+            elif state == ":" and type == ':':
+                state = "value"
+            elif state == "value" and type == '[':
+                containers.append('[')
+                state = "item"
+                yield ("start_array", None)
+            elif state == "value" and type in self.numbers:
+                # number COMPARATOR number is a comparison
+                value = token.value
+                token = next(tokens, None)
+                if token is not None and token.type == "COMPARATOR":
+                    comparator = token.value
+                    token = next(tokens, None)
+                    if token is None or token.type not in self.numbers:
+                        self.__error(token)
+                    value = self.parser.compare(value, comparator, token.value)
+                    token = next(tokens, None)
+                state = "entry"
+                yield ("value", value)
+                continue
+            elif state == "value" and type in self.values:
+                state = "entry"
+                yield ("value", token.value)
+            elif state in ["entry", "next"] and type == ',':
+                state = "key" if state == "entry" else "item"
+            elif state in ["key", "entry"] and type == '}':
+                containers.pop()
+                state = self.__close(containers)
+                yield ("end_object", None)
+            elif state in ["item", "next"] and type == ']':
+                containers.pop()
+                state = self.__close(containers)
+                yield ("end_array", None)
+            elif state == "end" and type is None:
+                return
+            else:
+                self.__error(token)
+            token = next(tokens, None)
+
+    # FLATTENING
+    def iter_flat(self, file: TextIO) -> Iterator[Tuple[Any, Any]]:
+        return self.flat(self.events(file))
+
+    def flat(self, events: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[Any, Any]]:
+        # same (path, value) pairs as AJSONParser.flatten, except that repeated keys are
+        # all reported instead of only the last one
+        frames = []  # [container, path, current key / index, entries] per open container
+        for event, value in events:
+            if event == "key":
+                frames[-1][2] = value
+                frames[-1][3] += 1
+            elif event == "value":
+                yield (self.__path(frames[-1][1], frames[-1][2]), value)
+            elif event in ["start_object", "start_array"]:
+                path = ""
+                if frames:
+                    if frames[-1][0] == '[':
+                        frames[-1][2] += 1  # next array index
+                    path = self.__path(frames[-1][1], frames[-1][2])
+                frames.append(['{', path, None, 0] if event == "start_object" else ['[', path, -1, 0])
+            elif event == "end_object":
+                _, path, _, entries = frames.pop()
+                if not entries and frames:  # empty nested object
+                    yield (path, None)
+            else:  # end_array
+                frames.pop()
+
+    # AUXILAR METHODS
+    def __token(self, type: str, value: Any, lexpos: int) -> LexToken:
+        token = LexToken()
+        token.type = type
+        token.value = value
+        token.lineno = self.lexer.lexer.lineno
+        token.lexpos = lexpos
+        token.lexer = self.lexer.lexer
+        return token
+
+    def __close(self, containers: list) -> str:
+        if not containers:
+            return "end"
+        return "entry" if containers[-1] == '{' else "next"
+
+    def __path(self, parent_key: Any, key: Any) -> Any:
+        return f"{parent_key}.{key}" if parent_key else key
+
+    def __error(self, token: LexToken):
+        self.parser.p_error(token)
@@ -0,0 +1,401 @@
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+
+
+def startup(runs: str = "10"):
+    # cold: empty table cache on every run || warm: tables generated by a previous run
+    script = "from ajson_parser import AJSONParser; AJSONParser()"
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    def run(cache_dir: str) -> float:
+        env = dict(os.environ, AJSON_CACHE_DIR=cache_dir)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], cwd=directory, env=env, check=True)
+        return time.perf_counter() - start
+
+    cold = []
+    for _ in range(int(runs)):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(run(cache_dir))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        run(cache_dir)
+        warm = [run(cache_dir) for _ in range(int(runs))]
+
+    print(f"cold start: {statistics.median(cold) * 1000:.1f} ms (median of {runs})")
+    print(f"warm start: {statistics.median(warm) * 1000:.1f} ms (median of {runs})")
+    print(f"speedup: {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+
+def scaling(sizes: str = "1000,10000,100000,1000000"):
+    # parse time per entry must stay flat as objects / arrays grow
+    from ajson_parser import AJSONParser
+    parser = AJSONParser()
+    documents = {
+        "object": lambda n: "{" + ", ".join(f"k{i}: {i}" for i in range(n)) + "}",
+        "array": lambda n: "{k: [" + ", ".join(f"{{k{i}: {i}}}" for i in range(n)) + "]}"
+    }
+    for name, document in documents.items():
+        for size in map(int, sizes.split(",")):
+            data = document(size)
+            start = time.perf_counter()
+            parser.parser.parse(data, lexer=parser.lexer.lexer)
+            elapsed = time.perf_counter() - start
+            print(f"{name} {size:>8} entries: {elapsed * 1000:10.1f} ms ({elapsed / size * 1e6:.2f} us/entry)")
+
+
+def stream(size: str = "20000"):
+    # whole-tree parse vs chunked event parse of the same file: time and peak memory
+    import tracemalloc
+    from collections import deque
+    from ajson_parser import AJSONParser
+    from ajson_stream import AJSONStreamParser
+    parser = AJSONParser()
+    stream_parser = AJSONStreamParser()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stream.ajson")
+        with open(path, 'w', encoding="UTF-8") as file:
+            file.write("{items: [\n")
+            file.writelines(f"{{id: {i}, name: \"item {i}\", ratio: {i}.5e-3, ok: TR}},\n" for i in range(int(size)))
+            file.write("]}\n")
+
+        def tree():
+            with open(path, 'r', encoding="UTF-8") as file:
+                deque(parser.flatten(parser.load(file.read())), maxlen=0)
+
+        def events():
+            with open(path, 'r', encoding="UTF-8") as file:
+                deque(stream_parser.iter_flat(file), maxlen=0)
+
+        for name, run in [("tree", tree), ("stream", events)]:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()  # separate run: tracing slows everything down
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:<6} {elapsed * 1000:10.1f} ms, peak memory {peak / 2 ** 20:8.1f} MiB")
+
+
+def _tokens(lexer, data: str) -> list:
+    # every token field, or the error raised
+    lexer.lexer.lineno = 1
+    lexer.lexer.input(data)
+    try:
+        return [(t.type, t.value, t.lineno, t.lexpos) for t in lexer.lexer]
+    except ValueError as e:
+        return [str(e)]
+
+
+def lexers(size: str = "100000"):
+    # identical token streams on every test file, then PLY vs compiled scanner on a large input
+    import glob
+    from ajson_lexer import AJSONLexer
+    engines = {engine: AJSONLexer(engine) for engine in ["ply", "scanner"]}
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(directory, "tests", "*.ajson"))):
+        with open(path, 'r', encoding="UTF-8") as file:
+            data = file.read()
+        if _tokens(engines["ply"], data) != _tokens(engines["scanner"], data):
+            raise ValueError(f"[ERROR][BENCHMARK]: Different token streams:\n"
+                f"# PROVIDED: {path}")
+    print("identical token streams on every test file")
+
+    data = "{items: [\n" + "".join(f"{{id: {i}, \"name\": \"item {i}\", hex: 0x{i:x}, ratio: -{i}.5e-3, ok: TR, r: {i} <= 0.5}},\n"
+        for i in range(int(size))) + "]}"
+    for engine, lexer in engines.items():
+        start = time.perf_counter()
+        lexer.tokenize(data)
+        elapsed = time.perf_counter() - start
+        print(f"{engine:<8} {elapsed * 1000:10.1f} ms ({len(data) / elapsed / 2 ** 20:.1f} MiB/s)")
+
+
+def tokens(size: str = "20000"):
+    # memory held per token: list of LexToken objects vs compact token buffer
+    import tracemalloc
+    from ajson_lexer import AJSONLexer
+    lexer = AJSONLexer()
+    data = "{items: [\n" + "".join(f"{{id: {i}, \"name\": \"item {i}\", hex: 0x{i:x}, ratio: -{i}.5e-3, ok: TR, r: {i} <= 0.5}},\n"
+        for i in range(int(size))) + "]}"
+
+    def token_list():
+        lexer.lexer.input(data)
+        return list(lexer.lexer)
+
+    results = {}
+    for name, build in [("LexToken list", token_list), ("token buffer", lambda: lexer.buffer(data))]:
+        tracemalloc.start()
+        result = build()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = [(t.type, t.value) for t in result] if name == "LexToken list" else list(result)
+        print(f"{name:<14} {len(result):>8} tokens: {current / len(result):8.1f} bytes/token held, peak {peak / 2 ** 20:8.1f} MiB")
+        del result
+    if results["LexToken list"] != results["token buffer"]:
+        raise ValueError("[ERROR][BENCHMARK]: Different token values in the token buffer")
+
+
+def source(size: str = "20000"):
+    # read() into a str vs memory-mapped file: load + lex time and peak memory
+    import tracemalloc
+    from collections import deque
+    from ajson_lexer import AJSONLexer
+    from ajson_source import open_source
+    lexer = AJSONLexer()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "source.ajson")
+        with open(path, 'w', encoding="UTF-8") as file:
+            file.write("{items: [\n")
+            file.writelines(f"{{id: {i}, \"name\": \"item {i}\", hex: 0x{i:x}, ratio: -{i}.5e-3, ok: TR}},\n" for i in range(int(size)))
+            file.write("]}\n")
+
+        def text():
+            with open(path, 'r', encoding="UTF-8") as file:
+                lexer.lexer.lineno = 1
+                lexer.lexer.input(file.read())
+                deque(lexer.lexer, maxlen=0)
+
+        def mapped():
+            with open_source(path) as data:
+                lexer.source.input(data)
+                deque(lexer.source, maxlen=0)
+
+        for name, run in [("read", text), ("mmap", mapped)]:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()  # separate run: tracing slows everything down
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:<4} {os.path.getsize(path) / 2 ** 20:6.1f} MiB file: {elapsed * 1000:10.1f} ms, peak memory {peak / 2 ** 20:8.1f} MiB")
+
+
+def comparisons(size: str = "1000000"):
+    # comparator dispatch table vs formatting each comparison for eval()
+    from decimal import Decimal
+    from ajson_parser import AJSONParser
+    parser = AJSONParser()
+    numbers = [12, 0.5, Decimal("1.5E+1"), 0x1f, Decimal("-2e-3")]
+    operations = [(numbers[i % len(numbers)], ["==", ">=", ">", "<=", "<"][i % 7 % 5], numbers[i * 3 % len(numbers)])
+        for i in range(int(size))]
+
+    start = time.perf_counter()
+    results = [parser.compare(left, comparator, right) for left, comparator, right in operations]
+    table = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = [eval(f"{left} {comparator} {right}") for left, comparator, right in operations]
+    evaluated = time.perf_counter() - start
+
+    if results != expected:
+        raise ValueError("[ERROR][BENCHMARK]: Different comparison results")
+    print(f"dispatch table {int(size):>8} comparisons: {table * 1000:10.1f} ms ({table / int(size) * 1e6:.2f} us/comparison)")
+    print(f"eval()         {int(size):>8} comparisons: {evaluated * 1000:10.1f} ms ({evaluated / int(size) * 1e6:.2f} us/comparison)")
+    print(f"speedup: {evaluated / table:.1f}x")
+
+
+def numbers(size: str = "20000", seed: str = "0"):
+    # SCIENTIFIC literals as Decimal (exact) vs float (fast), on a number-dense document, per lexer engine
+    import random
+    from ajson_lexer import AJSONLexer
+    data = _numbers(random.Random(int(seed)), int(size))
+    for engine in ["ply", "scanner"]:
+        values = {}
+        for policy in ["exact", "fast"]:
+            lexer = AJSONLexer(engine, policy)
+            start = time.perf_counter()
+            lexer.lexer.input(data)
+            values[policy] = [t.value for t in lexer.lexer if t.type == "SCIENTIFIC"]
+            elapsed = time.perf_counter() - start
+            print(f"{engine:<8} {policy:<6} {len(data) / 2 ** 20:6.1f} MiB: {elapsed * 1000:10.1f} ms ({len(values[policy])} SCIENTIFIC)")
+        if [float(value) for value in values["exact"]] != values["fast"]:
+            raise ValueError("[ERROR][BENCHMARK]: Different SCIENTIFIC values")
+
+
+def _wide(rng, size: int) -> str:
+    # one object with many keys & scalar values
+    values = [lambda: str(rng.randint(-10 ** 6, 10 ** 6)), lambda: f"{rng.uniform(-1e3, 1e3):.4f}", lambda: rng.choice(["TR", "FL", "NULL"]),
+        lambda: f"\"{_words(rng, 3)}\"", lambda: f"0x{rng.randrange(1 << 32):X}"]
+    return "{\n" + ",\n".join(f"k{i}: {rng.choice(values)()}" for i in range(size)) + "\n}\n"
+
+
+def _deep(rng, size: int) -> str:
+    # chains of nested objects, 16 to 64 levels each, a scalar & an array of objects at every level
+    chains, count = [], 0
+    while count < size:
+        depth = rng.randint(16, 64)
+        chains.append(f"c{len(chains)}: " + "".join(f"{{v: {level}, a: [{{w: TR}}, {{x: {level}}}], n: " for level in range(depth))
+            + "NULL" + "}" * depth)
+        count += depth * 4
+    return "{\n" + ",\n".join(chains) + "\n}\n"
+
+
+def _numbers(rng, size: int) -> str:
+    # arrays of objects with numbers in every notation & comparisons between them
+    notations = [lambda: str(rng.randint(-10 ** 9, 10 ** 9)), lambda: f"{rng.uniform(-1e6, 1e6):.6f}",
+        lambda: f"{rng.uniform(-10, 10):.3f}e{rng.randint(-30, 30)}", lambda: f"0x{rng.randrange(1 << 48):x}",
+        lambda: f"0{rng.randrange(1, 1 << 30):o}", lambda: f"0b{rng.randrange(1, 1 << 20):b}"]
+    entries = []
+    for i in range(0, size, 17):
+        entries.append(f"n{i}: [" + ", ".join(f"{{x: {rng.choice(notations)()}}}" for _ in range(16)) + "]")
+        entries.append(f"c{i}: {rng.choice(notations)()} {rng.choice(['==', '>=', '>', '<=', '<'])} {rng.choice(notations)()}")
+    return "{\n" + ",\n".join(entries) + "\n}\n"
+
+
+def _strings(rng, size: int) -> str:
+    # explicit string keys & values, arrays of objects with strings
+    entries = []
+    for i in range(0, size, 5):
+        entries.append(f"\"{_words(rng, 2)} {i}\": \"{_words(rng, rng.randint(1, 12))}\"")
+        entries.append(f"s{i}: [" + ", ".join(f"{{s: \"{_words(rng, rng.randint(1, 4))}\"}}" for _ in range(4)) + "]")
+    return "{\n" + ",\n".join(entries) + "\n}\n"
+
+
+def _words(rng, n: int) -> str:
+    return " ".join("".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 9))) for _ in range(n))
+
+
+# seeded corpus generators of the suite: (random generator, entries) -> AJSON document
+CORPORA = {
+    "wide": _wide,
+    "deep": _deep,
+    "numbers": _numbers,
+    "strings": _strings
+}
+
+
+class _Replay:
+    # PLY lexer interface over tokens lexed before
+    def __init__(self, tokens: list):
+        self.token = iter(tokens + [None]).__next__
+
+
+def _syntax(parser):
+    # same LALR tables with no rule actions: the parser automaton alone
+    import copy
+    syntax = copy.copy(parser)
+    syntax.productions = [copy.copy(production) for production in parser.productions]
+    for production in syntax.productions:
+        production.callable = lambda p: None
+    return syntax
+
+
+def _commit() -> str:
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:  # no git
+        return "unknown"
+    return result.stdout.strip() or "unknown"
+
+
+def suite(size: str = "20000", runs: str = "5", seed: str = "0", output: str = None):
+    # phases timed separately on each generated corpus, results stored as JSON to compare commits
+    import gc
+    import io
+    import json
+    import random
+    import platform
+    from ajson_parser import AJSONParser
+    parser = AJSONParser()
+    syntax = _syntax(parser.parser)
+    results = {"suite": "ajson", "commit": _commit(), "python": platform.python_version(), "machine": platform.machine(),
+        "seed": int(seed), "size": int(size), "runs": int(runs), "corpora": {}}
+
+    for name, generate in CORPORA.items():
+        data = generate(random.Random(f"{seed}:{name}"), int(size))
+        phases = {"lex": [], "parse": [], "semantic": [], "output": []}  # semantic: whole parse, then minus the automaton
+        for _ in range(int(runs)):
+            gc.collect()
+            start = time.perf_counter()
+            parser.lexer.lexer.input(data)
+            tokens = list(parser.lexer.lexer)
+            phases["lex"].append(time.perf_counter() - start)
+
+            gc.collect()
+            start = time.perf_counter()
+            syntax.parse(lexer=_Replay(tokens))
+            phases["parse"].append(time.perf_counter() - start)
+
+            gc.collect()
+            start = time.perf_counter()
+            value = parser.parser.parse(lexer=_Replay(tokens))
+            phases["semantic"].append(time.perf_counter() - start)
+
+            gc.collect()
+            start = time.perf_counter()
+            parser.write(value, io.StringIO())
+            phases["output"].append(time.perf_counter() - start)
+
+        times = {phase: min(times) for phase, times in phases.items()}  # least disturbed run
+        times["semantic"] = max(times["semantic"] - times["parse"], 0)  # rule actions only
+        results["corpora"][name] = {"bytes": len(data.encode("UTF-8")), "tokens": len(tokens),
+            "phases": {phase: round(elapsed * 1000, 3) for phase, elapsed in times.items()}}
+        print(f"{name:<8} {len(data) / 2 ** 20:6.2f} MiB {len(tokens):>8} tokens: "
+            + ", ".join(f"{phase} {ms:9.1f} ms" for phase, ms in results["corpora"][name]["phases"].items()))
+
+    output = output or f"suite-{results['commit']}.json"
+    with open(output, 'w', encoding="UTF-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"results: {output} (best of {runs})")
+
+
+def compare(old: str, new: str, threshold: str = "10"):
+    # phase times of two suite results: regressions beyond <threshold> % fail
+    import json
+    with open(old, encoding="UTF-8") as file:
+        before = json.load(file)
+    with open(new, encoding="UTF-8") as file:
+        after = json.load(file)
+    if (before["suite"], before["seed"], before["size"]) != (after["suite"], after["seed"], after["size"]):
+        raise ValueError(f"[ERROR][BENCHMARK]: Different suite corpora:\n"
+            f"# PROVIDED: {after['suite']}, seed {after['seed']}, size {after['size']}\n"
+            f"# EXPECTED: {before['suite']}, seed {before['seed']}, size {before['size']}")
+
+    regressions = 0
+    print(f"{before['commit']} -> {after['commit']}")
+    for name, corpus in after["corpora"].items():
+        for phase, ms in corpus["phases"].items():
+            previous = before["corpora"].get(name, {}).get("phases", {}).get(phase)
+            if previous is None:
+                continue
+            change = (ms - previous) / previous * 100 if previous else 0.0
+            slower = change > float(threshold)
+            regressions += slower
+            print(f"{name:<8} {phase:<8} {previous:10.1f} ms -> {ms:10.1f} ms {change:+7.1f} %{'  SLOWER' if slower else ''}")
+    print(f">>> {regressions} PHASES SLOWER THAN {threshold} %")
+    if regressions:
+        sys.exit(1)
+
+
+BENCHMARKS = {
+    "startup": startup,
+    "scaling": scaling,
+    "stream": stream,
+    "lexers": lexers,
+    "tokens": tokens,
+    "source": source,
+    "comparisons": comparisons,
+    "numbers": numbers,
+    "suite": suite,
+    "compare": compare
+}
+
+
+def main():
+    # CHECK BENCHMARK
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        raise ValueError(f"INCORRECT BENCHMARK:\n"
+            f"# PROVIDED: {sys.argv[1] if len(sys.argv) > 1 else None}\n"
+            f"# EXPECTED: {' || '.join(BENCHMARKS)}\n"
+            f"# USAGE: python3 ./benchmark.py <benchmark> [<argument> ...]")
+
+    BENCHMARKS[sys.argv[1]](*sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
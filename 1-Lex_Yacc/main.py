@@ -1,7 +1,19 @@
 import sys
 import os
+import io
+import glob
+import mmap
+import time
+import hashlib
+import multiprocessing
+from itertools import chain, islice
+from contextlib import nullcontext
+from typing import Tuple, TextIO, Union
 from ajson_lexer import AJSONLexer
 from ajson_parser import AJSONParser
+from ajson_stream import AJSONStreamParser
+from ajson_source import open_source
+from ajson_profile import AJSONProfiler, OFF
 
 
 def main():
@@ -10,9 +22,12 @@ def main():
         raise ValueError(f"INCORRECT ARGUMENT NUMBER:\n"
             f"# PROVIDED: {len(sys.argv)}\n"
             f"# EXPECTED: 3\n"
-            f"# USAGE: python3 ./main.py <path>.ajson -<mode>\n"
-            f"# - <path>: path to an AJSON file. Examples in ./1-Lex_Yacc/tests\n"
-            f"# - <mode>: lex = lexer || par = parser")
+            f"# USAGE: python3 ./main.py <path>.ajson -<mode> [--<option> ...]\n"
+            f"# - <path>: path to an AJSON file, or a directory / glob of them. Examples in ./1-Lex_Yacc/tests\n"
+            f"# - <mode>: lex = lexer || par = parser\n"
+            f"# - <option>: stream = chunked input, bounded memory || scanner = compiled scanner lexer || jobs <N> = N worker processes || "
+                f"watch = run again the files that change, until interrupted || "
+                f"profile [<report>.json] = time per phase, grammar production & token, peak memory")
     
     # CHECK MODE
     if sys.argv[2] not in ["-lex", "-par"]:
@@ -23,31 +38,210 @@ def main():
             f"# - ...\n"
             f"# - <mode>: lex = lexer || par = parser")
     
+    # CHECK OPTIONS
+    jobs, profile = os.cpu_count(), None
+    options = sys.argv[3:]
+    while options:
+        option, options = options[0], options[1:]
+        if option == "--jobs":
+            jobs, options = (options[0], options[1:]) if options else (None, options)
+            if jobs is None or not jobs.isdigit() or int(jobs) < 1:
+                raise ValueError(f"INCORRECT JOBS NUMBER:\n"
+                    f"# PROVIDED: {jobs}\n"
+                    f"# EXPECTED: positive integer\n"
+                    f"# USAGE: python3 ./main.py ... --jobs <N>")
+            jobs = int(jobs)
+        elif option == "--profile":  # report file or summary
+            profile, options = (options[0], options[1:]) if options and options[0].endswith(".json") else ("", options)
+        elif option not in ["--stream", "--scanner", "--watch"]:
+            raise ValueError(f"INCORRECT OPTION:\n"
+                f"# PROVIDED: {option}\n"
+                f"# EXPECTED: stream || scanner || jobs || watch || profile\n"
+                f"# USAGE: python3 ./main.py ... --<option>\n"
+                f"# - ...\n"
+                f"# - <option>: stream = chunked input, bounded memory || scanner = compiled scanner lexer || jobs <N> = N worker processes || "
+                f"watch = run again the files that change, until interrupted || "
+                f"profile [<report>.json] = time per phase, grammar production & token, peak memory")
+    if "--watch" in sys.argv[3:] and "--jobs" in sys.argv[3:]:  # watch mode runs in one process
+        raise ValueError(f"INCORRECT OPTIONS:\n"
+            f"# PROVIDED: {' '.join(sys.argv[3:])}\n"
+            f"# EXPECTED: --jobs <N> || --watch\n"
+            f"# USAGE: python3 ./main.py ... --jobs <N> || python3 ./main.py ... --watch")
+
+    # PROFILE MODE
+    if profile is not None:
+        global PROFILER
+        PROFILER = AJSONProfiler()  # analyzers built from now on are instrumented
+        PROFILER.start()
+        try:
+            dispatch(sys.argv[1], jobs)
+        finally:
+            PROFILER.stop()
+            if profile:
+                PROFILER.write(profile)
+                print(f">>> PROFILE REPORT {profile}", file=sys.stderr)
+            else:
+                print(PROFILER.summary(), file=sys.stderr)
+        return
+
+    dispatch(sys.argv[1], jobs)
+
+
+def dispatch(path: str, jobs: int):
+    # WATCH MODE
+    if "--watch" in sys.argv[3:]:
+        watch(path)
+        return
+
+    # BATCH MODE
+    if os.path.isdir(path) or glob.has_magic(path) or "--jobs" in sys.argv[3:]:
+        batch(path, jobs)
+        return
+
     # CHECK FILE EXTENSION
-    if os.path.splitext(sys.argv[1])[1] != ".ajson":
+    if os.path.splitext(path)[1] != ".ajson":
         raise ValueError(f"INCORRECT FILE EXTENSION:\n"
-            f"# PROVIDED: {os.path.splitext(sys.argv[1])[1]}\n"
+            f"# PROVIDED: {os.path.splitext(path)[1]}\n"
             f"# EXPECTED: .ajson")
 
+    run(path, sys.stdout)
+
+
+def run(path: str, out: TextIO):
     # OPEN <file_path>.ajson
-    try:
-        with open(sys.argv[1], 'r', encoding="UTF-8") as file:
-            data = file.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"FILE PATH NOT EXIST:\n"
-            f"# PROVIDED: {sys.argv[1]}")
-    
+    if "--stream" in sys.argv[3:]:
+        try:
+            file = open(path, 'r', encoding="UTF-8")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"FILE PATH NOT EXIST:\n"
+                f"# PROVIDED: {path}")
+
+        with file, PROFILER.phase("stream"):  # parse & output interleaved
+            stream(file, path, out)
+    else:
+        with open_source(path) as data:
+            analyze(data, path, out)
+
+
+# warm lexers & parsers, built once per process
+ANALYZERS = {}
+# --profile: phases, grammar actions & tokens of the analyzers
+PROFILER = OFF
+
+
+def analyzer(kind: type, engine: str):
+    if (kind, engine) not in ANALYZERS:
+        with PROFILER.phase("setup"):  # lexer & parser tables
+            ANALYZERS[(kind, engine)] = kind(engine)
+        if PROFILER.enabled:
+            PROFILER.instrument(ANALYZERS[(kind, engine)])
+    return ANALYZERS[(kind, engine)]
+
+
+def analyze(data: Union[str, mmap.mmap, bytes], path: str, out: TextIO):
+    engine = "scanner" if "--scanner" in sys.argv[3:] else "ply"
+    if engine == "scanner" and not isinstance(data, str):  # the scanner reads text
+        data = str(data, "UTF-8")
+    if sys.argv[2] == "-par":  # lexer & parser
+        parser = analyzer(AJSONParser, engine)
+        with PROFILER.phase("parse"):
+            data = parser.load(data)
+        with PROFILER.phase("output"):
+            if data is None:
+                print(f">>> EMPTY AJSON FILE {path}", file=out)
+            else:
+                print(f">>> AJSON FILE {path}", file=out)
+                parser.write(data, out)
+    else:  # lexer
+        lexer = analyzer(AJSONLexer, engine)
+        with PROFILER.phase("tokenize"):
+            tokens = lexer.tokenize(data)
+        with PROFILER.phase("output"):
+            print(tokens, file=out)
+
+
+def stream(file: TextIO, path: str, out: TextIO):
+    parser = AJSONStreamParser()
     if sys.argv[2] == "-par":  # lexer & parser
-        parser = AJSONParser()
-        output = parser.parse(data)
-        if output is None:
-            output = f">>> EMPTY AJSON FILE {sys.argv[1]}"
+        events = parser.events(file)
+        head = list(islice(events, 2))
+        if len(head) < 2 or head[1][0] == "end_object":  # no file content or {}
+            list(events)  # still check the rest of the file
+            print(f">>> EMPTY AJSON FILE {path}", file=out)
         else:
-            output = f">>> AJSON FILE {sys.argv[1]}\n" + output
+            print(f">>> AJSON FILE {path}", file=out)
+            out.writelines(f"{{ {key}: {value} }}\n" for key, value in parser.flat(chain(head, events)))
     else:  # lexer
-        lexer = AJSONLexer()
-        output = lexer.tokenize(data)
-    print(output)
+        out.writelines(f"{t.type} {t.value}\n" for t in parser.tokens(file))
+
+
+def batch(pattern: str, jobs: int):
+    # every .ajson file under a directory / matching a glob, results in path order
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.ajson")
+    paths = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.splitext(path)[1] == ".ajson")
+
+    errors = 0
+    with nullcontext() if PROFILER.enabled else multiprocessing.Pool(min(jobs, max(len(paths), 1))) as pool:
+        # --profile: every file in this process
+        results = map(work, paths) if pool is None else pool.imap(work, paths, chunksize=max(1, min(64, len(paths) // (jobs * 4))))
+        for path, output, error in results:
+            if error is None:
+                sys.stdout.write(output)
+            else:  # gathered per file, the batch goes on
+                errors += 1
+                print(f">>> ERROR IN AJSON FILE {path}\n{error}")
+    print(f">>> {len(paths)} AJSON FILES, {errors} WITH ERRORS")
+    if errors:
+        sys.exit(1)
+
+
+def watch(pattern: str, interval: float = 0.1):
+    # poll the .ajson files under a directory / matching a glob, run the ones whose content changed in this process
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.ajson")
+    states = {}  # path -> ((modification time, size), content hash)
+    try:
+        while True:
+            paths = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.splitext(path)[1] == ".ajson")
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                    state = states.get(path)
+                    if state is not None and state[0] == (stat.st_mtime_ns, stat.st_size):  # untouched
+                        continue
+                    with open(path, "rb") as file:
+                        digest = hashlib.blake2b(file.read(), digest_size=16).digest()
+                except FileNotFoundError:  # removed meanwhile
+                    continue
+                states[path] = ((stat.st_mtime_ns, stat.st_size), digest)
+                if state is not None and state[1] == digest:  # saved again, same content
+                    continue
+
+                _, output, error = work(path)
+                if error is None:
+                    sys.stdout.write(output)
+                    sys.stdout.flush()
+                else:
+                    print(f">>> ERROR IN AJSON FILE {path}\n{error}", flush=True)
+            for path in states.keys() - set(paths):
+                del states[path]
+                print(f">>> REMOVED AJSON FILE {path}", flush=True)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print(f">>> {len(states)} AJSON FILES WATCHED")
+
+
+def work(path: str) -> Tuple[str, Union[str, None], Union[str, None]]:
+    # worker process: (path, output, error)
+    out = io.StringIO()
+    try:
+        run(path, out)
+    except (ValueError, FileNotFoundError) as e:  # analysis errors
+        return (path, None, str(e))
+    except Exception as e:
+        return (path, None, f"{type(e).__name__}: {e}")
+    return (path, out.getvalue(), None)
 
 
 if __name__ == "__main__":
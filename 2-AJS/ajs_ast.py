@@ -0,0 +1,26 @@
+from typing import Any, List
+
+
+class AJSNode:
+    __slots__ = ("kind", "value", "children", "type", "layout", "address", "position")
+
+    def __init__(self, kind: str, value: Any = None, children: List["AJSNode"] = None, type: str = None):
+        self.kind = kind  # block || let || declare || assign || set || type || if || while || function || expression ||
+                          # const || name || attribute || object || call || unary || binary
+        self.value = value
+        self.children = [] if children is None else children
+        self.type = type  # static AJS type of expressions
+        self.layout = None  # object & attribute nodes: layout of the object type
+        self.address = None  # name & assign nodes: (depth, slot) of the variable, let & declare nodes: one per name
+        self.position = None  # source offset of its first token
+
+    def __str__(self) -> str:
+        return self.dump()
+
+    def __repr__(self) -> str:
+        return f"AJSNode({self.kind}, {self.value!r})"
+
+    def dump(self, indent: int = 0) -> str:
+        lines = [f"{'  ' * indent}{self.kind}" + ("" if self.value is None else f" {self.value!r}") + ("" if self.type is None else f" : {self.type}")]
+        lines += [child.dump(indent + 1) for child in self.children]
+        return "\n".join(lines)
@@ -0,0 +1,78 @@
+import os
+import glob
+import json
+import hashlib
+import tempfile
+from typing import Any, Union
+import ply
+
+RESULT_CACHE_DIR = os.environ.get("AJS_RESULT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "__ajscache__"))
+
+# bytes kept on disk before the least recently used results are evicted, 0 = no cache
+RESULT_CACHE_SIZE = int(os.environ.get("AJS_RESULT_CACHE_SIZE", 64 * 2 ** 20))
+
+
+class AJSResultCache:
+    def __init__(self, cache_dir: str = RESULT_CACHE_DIR, max_size: int = RESULT_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.__version = None
+
+    # KEYS
+    def version(self) -> str:
+        # any change to the analyzer sources invalidates every result
+        if self.__version is None:
+            items = hashlib.sha256(ply.__version__.encode("UTF-8"))
+            for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "ajs_*.py"))):
+                with open(path, 'rb') as file:
+                    items.update(file.read())
+            self.__version = items.hexdigest()
+        return self.__version
+
+    def key(self, mode: str, data: Union[str, bytes, Any]) -> str:
+        items = hashlib.sha256(f"{self.version()}:{mode}:".encode("UTF-8"))
+        items.update(data.encode("UTF-8") if isinstance(data, str) else data)
+        return items.hexdigest()
+
+    # ENTRIES
+    def get(self, key: str) -> Union[dict, None]:
+        if not self.max_size:
+            return None
+        path = os.path.join(self.cache_dir, key + ".json")
+        try:
+            with open(path, 'r', encoding="UTF-8") as file:
+                outputs = json.load(file)
+            os.utime(path)  # most recently used
+            return outputs
+        except (OSError, ValueError):  # missing or unreadable entry
+            return None
+
+    def put(self, key: str, outputs: dict):
+        if not self.max_size:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        descriptor, path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(descriptor, 'w', encoding="UTF-8") as file:
+            json.dump(outputs, file)
+        os.replace(path, os.path.join(self.cache_dir, key + ".json"))  # atomic for concurrent batch workers
+        self.evict()
+
+    def evict(self):
+        # least recently used entries go first until the cache fits in max_size
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+                except OSError:  # removed by another process
+                    pass
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
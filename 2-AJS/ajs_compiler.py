@@ -0,0 +1,243 @@
+from decimal import Decimal
+from typing import Any, List, Tuple
+from ajs_ast import AJSNode
+
+# OPCODES: every instruction is an (opcode, argument) pair of the flat code list
+LOAD_CONST, LOAD_GLOBAL, STORE_GLOBAL, LOAD_LOCAL, STORE_LOCAL, DUP, POP = range(7)
+JUMP, JUMP_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, CALL, RETURN, HALT = range(7, 14)
+ADD, SUB, MUL, DIV, LT, LE, EQ, GE, GT, NEG, NOT, TO_FLOAT = range(14, 26)
+BUILD_OBJECT, GET_ATTRIBUTE, SET_ATTRIBUTE = range(26, 29)
+
+OPCODES = ["LOAD_CONST", "LOAD_GLOBAL", "STORE_GLOBAL", "LOAD_LOCAL", "STORE_LOCAL", "DUP", "POP",
+    "JUMP", "JUMP_IF_FALSE", "JUMP_IF_FALSE_OR_POP", "JUMP_IF_TRUE_OR_POP", "CALL", "RETURN", "HALT",
+    "ADD", "SUB", "MUL", "DIV", "LT", "LE", "EQ", "GE", "GT", "NEG", "NOT", "TO_FLOAT",
+    "BUILD_OBJECT", "GET_ATTRIBUTE", "SET_ATTRIBUTE"]
+
+OPERATORS = {
+    "PLUS": ADD,
+    "MINUS": SUB,
+    "TIMES": MUL,
+    "DIVIDE": DIV,
+    "LT": LT,
+    "LE": LE,
+    "EQ": EQ,
+    "GE": GE,
+    "GT": GT
+}
+
+
+class AJSFunction:
+    __slots__ = ("name", "arguments", "locals", "code")
+
+    def __init__(self, name: str, arguments: int, locals: int, code: List[int]):
+        self.name = name
+        self.arguments = arguments
+        self.locals = locals  # arguments included
+        self.code = code
+
+
+class AJSProgram:
+    def __init__(self, main: AJSFunction, functions: List[AJSFunction], constants: List[Any], names: List[str]):
+        self.main = main
+        self.functions = functions
+        self.constants = constants
+        self.names = names  # global variables by slot
+
+    def disassemble(self) -> str:
+        lines = []
+        for function in [self.main] + self.functions:
+            lines.append(f"{function.name}: {function.arguments} arguments, {function.locals} locals")
+            for pc in range(0, len(function.code), 2):
+                lines.append(f"  {pc:>5} {OPCODES[function.code[pc]]:<20} {function.code[pc + 1]}")
+        return "\n".join(lines)
+
+
+class AJSCompiler:
+    def __init__(self):
+        self.__compilers = {
+            "block": self.__block,
+            "let": self.__let,
+            "declare": self.__declare,
+            "assign": self.__assign,
+            "set": self.__set,
+            "type": self.__nothing,
+            "function": self.__function,
+            "if": self.__if,
+            "while": self.__while,
+            "expression": self.__expression,
+            "const": self.__const,
+            "name": self.__name,
+            "attribute": self.__attribute,
+            "object": self.__object,
+            "call": self.__call,
+            "unary": self.__unary,
+            "binary": self.__binary
+        }
+
+    # RUN
+    def compile(self, ast: AJSNode) -> AJSProgram:
+        self.__constants, self.__constant_slots = [], {}
+        self.__names = []  # by global slot
+        self.__functions, self.__function_slots = [], {}  # redefined functions take a new slot
+        self.__locals = None  # frame size of the function being compiled
+        self.__code = []
+        if ast is not None:
+            self.__compile(ast)
+        self.__emit(HALT)
+        return AJSProgram(AJSFunction("<main>", 0, 0, self.__code), self.__functions, self.__constants, self.__names)
+
+    def __compile(self, node: AJSNode):
+        self.__compilers[node.kind](node)
+
+    # STATEMENTS
+    def __block(self, node: AJSNode):
+        for child in node.children:
+            self.__compile(child)
+
+    def __nothing(self, node: AJSNode):
+        pass
+
+    def __let(self, node: AJSNode):
+        if node.children:
+            self.__compile(node.children[0])
+        else:
+            self.__emit(LOAD_CONST, self.__constant(None))
+        for index, (name, address) in enumerate(zip(node.value, node.address)):
+            if index < len(node.value) - 1:  # every name gets the same value
+                self.__emit(DUP)
+            self.__store(name, address)
+
+    def __declare(self, node: AJSNode):
+        # names of removed let statements: no code, their slots are still taken
+        for name, address in zip(node.value, node.address):
+            self.__slot(name, address)
+
+    def __assign(self, node: AJSNode):
+        self.__compile(node.children[0])
+        self.__store(node.value, node.address)
+
+    def __set(self, node: AJSNode):
+        target, value = node.children
+        offsets = target.layout.path(tuple(target.value))[0]
+        self.__compile(target.children[0])
+        for offset in offsets[:-1]:
+            self.__emit(GET_ATTRIBUTE, offset)
+        self.__compile(value)
+        self.__emit(SET_ATTRIBUTE, offsets[-1])
+
+    def __expression(self, node: AJSNode):
+        self.__compile(node.children[0])
+        self.__emit(POP)
+
+    def __if(self, node: AJSNode):
+        self.__compile(node.children[0])
+        otherwise = self.__emit(JUMP_IF_FALSE)
+        self.__compile(node.children[1])
+        if len(node.children) == 3:
+            end = self.__emit(JUMP)
+            self.__patch(otherwise)
+            self.__compile(node.children[2])
+            self.__patch(end)
+        else:
+            self.__patch(otherwise)
+
+    def __while(self, node: AJSNode):
+        start = len(self.__code)
+        self.__compile(node.children[0])
+        end = self.__emit(JUMP_IF_FALSE)
+        self.__compile(node.children[1])
+        self.__emit(JUMP, start)
+        self.__patch(end)
+
+    def __function(self, node: AJSNode):
+        # own code list, arguments & let declarations of the body are locals, at the slots given by the parser
+        name, arguments = node.value
+        self.__function_slots[name] = len(self.__functions)  # before the body: recursive calls
+        function = AJSFunction(name, len(arguments), 0, [])
+        self.__functions.append(function)
+
+        code, locals = self.__code, self.__locals
+        self.__code = function.code
+        self.__locals = len(arguments)
+        self.__compile(node.children[0])
+        self.__compile(node.children[1])
+        self.__emit(RETURN)
+        function.locals = self.__locals
+        self.__code, self.__locals = code, locals
+
+    # EXPRESSIONS
+    def __const(self, node: AJSNode):
+        value = float(node.value) if isinstance(node.value, Decimal) else node.value  # as eval reads it
+        self.__emit(LOAD_CONST, self.__constant(value))
+
+    def __name(self, node: AJSNode):
+        self.__emit(LOAD_LOCAL if node.address[0] else LOAD_GLOBAL, self.__slot(node.value, node.address))
+
+    def __attribute(self, node: AJSNode):
+        self.__compile(node.children[0])
+        for offset in node.layout.path(tuple(node.value))[0]:
+            self.__emit(GET_ATTRIBUTE, offset)
+
+    def __object(self, node: AJSNode):
+        # items in source order, argument: source position of each layout slot
+        for child in node.children:
+            self.__compile(child)
+        offsets = node.layout.shape(tuple(node.value))
+        self.__emit(BUILD_OBJECT, self.__constant(tuple(sorted(range(len(offsets)), key=offsets.__getitem__))))
+
+    def __call(self, node: AJSNode):
+        for child in node.children:
+            self.__compile(child)
+        self.__emit(CALL, self.__function_slots[node.value])
+
+    def __unary(self, node: AJSNode):
+        self.__compile(node.children[0])
+        if node.value == "NOT":
+            self.__emit(NOT)
+            return
+        if node.type == "FLOAT":  # same cast as AJSOperator
+            self.__emit(TO_FLOAT)
+        if node.value == "MINUS":
+            self.__emit(NEG)
+
+    def __binary(self, node: AJSNode):
+        if node.value in ["AND", "OR"]:  # short-circuit
+            self.__compile(node.children[0])
+            end = self.__emit(JUMP_IF_FALSE_OR_POP if node.value == "AND" else JUMP_IF_TRUE_OR_POP)
+            self.__compile(node.children[1])
+            self.__patch(end)
+            return
+        for child in node.children:
+            self.__compile(child)
+            if node.type == "FLOAT":  # same cast as AJSOperator
+                self.__emit(TO_FLOAT)
+        self.__emit(OPERATORS[node.value])
+
+    # AUXILAR METHODS
+    def __emit(self, opcode: int, argument: int = 0) -> int:
+        self.__code += [opcode, argument]
+        return len(self.__code) - 2
+
+    def __patch(self, position: int):
+        # jump at `position` goes to the next instruction
+        self.__code[position + 1] = len(self.__code)
+
+    def __store(self, name: str, address: Tuple[int, int]):
+        self.__emit(STORE_LOCAL if address[0] else STORE_GLOBAL, self.__slot(name, address))
+
+    def __constant(self, value: Any) -> int:
+        key = (type(value), value)  # 1, 1.0 & True are different constants
+        if key not in self.__constant_slots:
+            self.__constant_slots[key] = len(self.__constants)
+            self.__constants.append(value)
+        return self.__constant_slots[key]
+
+    def __slot(self, name: str, address: Tuple[int, int]) -> int:
+        # (depth, slot) from the parser: locals grow the frame, globals name their slot
+        depth, slot = address
+        if depth:
+            self.__locals = max(self.__locals, slot + 1)
+        else:
+            self.__names += [None] * (slot + 1 - len(self.__names))
+            self.__names[slot] = name
+        return slot
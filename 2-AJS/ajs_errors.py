@@ -0,0 +1,13 @@
+from typing import Optional
+
+
+class AJSError(ValueError):
+    # lexer, syntax & semantic errors: offset in the input they were raised for, None if unknown
+    def __init__(self, message: str, offset: Optional[int] = None):
+        super().__init__(message)
+        self.offset = offset
+
+
+class AJSSemanticError(AJSError):
+    # raised by a grammar rule: offset of the first token of its production
+    pass
@@ -0,0 +1,418 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from ajs_layout import AJSStruct
+from ajs_object import AJSObject
+from ajs_parser import AJSParser
+from ajs_errors import AJSSemanticError
+from ajs_tokens import AJSTokenList
+
+# order keys of consecutive items start this far apart, inserted items take keys in between
+GAP = 1 << 40
+# items ending with their closing brace instead of a semicolon
+BLOCKS = ["IF", "WHILE", "FUNCTION"]
+KINDS = ["type", "function", "variable"]
+ORDER = attrgetter("order")
+
+
+class AJSItem:
+    __slots__ = ("text", "tokens", "order", "reads", "writes", "aliases", "error", "failure", "ended")
+
+    def __init__(self, text: str, tokens: List[Tuple[str, Any, int]]):
+        # one top-level statement, block or function: source from its first token up to the next item
+        self.text = text
+        self.tokens = tokens  # (type, value, position in text), illegal characters as ("error", lexer error, position)
+        self.order = 0
+        self.reads = set()  # names of the definitions it was analyzed with
+        self.writes = {}  # (kind, name) -> value it defines or assigns at the top level
+        self.aliases = {}  # variable -> variables written sharing an object with it, itself included
+        self.error = None
+        self.failure = None  # offset in text of its error
+        self.ended = False  # semantic error of a reduction after the last token: the next token comes first
+
+
+class AJSDocument:
+    def __init__(self, text: str = "", parser: AJSParser = None):
+        # source kept analyzed across edits, item by item
+        self.parser = AJSParser() if parser is None else parser
+        self.__items = self.__split(text, len(text))
+        self.__starts = [0]  # offset of each item, items from `pivot` on are `lag` characters further
+        for item in self.__items[:-1]:
+            self.__starts.append(self.__starts[-1] + len(item.text))
+        self.__pivot, self.__lag = len(self.__items), 0
+        self.__length = len(text)
+        self.__versions = {}  # (kind, name) -> items writing it, in order
+        self.__readers = {}  # name -> items reading it, in order
+        self.__errors = set()  # items with a lexer, parser or semantic error
+        for index, item in enumerate(self.__items):
+            item.order = (index + 1) * GAP
+            self.__analyze(item)
+
+    # EDITS
+    def edit(self, start: int, end: int, text: str) -> int:
+        # replace source[start:end] with `text`: number of items analyzed again
+        if not 0 <= start <= end <= self.__length:
+            raise ValueError(f"INCORRECT EDIT RANGE:\n"
+                f"# PROVIDED: [{start}, {end})\n"
+                f"# EXPECTED: [0, {self.__length}]")
+        # damaged items, the one before included: an `else` or trailing text can join it
+        first = self.__reopened(max(self.__locate(start) - 1, 0), start)
+        last = self.__locate(max(end - 1, start)) + 1
+        offset = self.__start(first)
+        region = "".join([item.text for item in self.__items[first:last]])
+        region = region[:start - offset] + text + region[end - offset:]
+        self.__length += len(text) - (end - start)
+
+        # relex until the tokens & items line up again with the start of an unchanged item
+        while True:
+            if last == len(self.__items):
+                items = self.__split(region, len(region))
+                break
+            items = self.__split(region + self.__items[last].text, len(region))
+            if items is not None:
+                break
+            region += self.__items[last].text
+            last += 1
+        return self.__replace(first, last, items)
+
+    # RESULTS
+    def __len__(self) -> int:
+        return self.__length
+
+    @property
+    def text(self) -> str:
+        return "".join([item.text for item in self.__items])
+
+    @property
+    def error(self) -> Optional[Exception]:
+        # first error in the source, what a full parse raises: located where the item is now
+        if not self.__errors:
+            return None
+        item = min(self.__errors, key=ORDER)
+        index = bisect_left(self.__items, item.order, key=ORDER)
+        if item.ended and index + 1 < len(self.__items):  # a full parse reads the next token before reducing
+            after = self.__items[index + 1]
+            if after.failure == after.tokens[0][2] and not isinstance(after.error, AJSSemanticError):
+                item, index = after, index + 1
+        if item.failure is None:
+            return item.error
+        return self.parser.lexer.located(item.error, self.text, self.__start(index) + min(item.failure, len(item.text)))
+
+    def tokens(self) -> Iterator[Tuple[str, Any]]:
+        # raises the lexer error of the first illegal character, as the lexer does
+        for index, item in enumerate(self.__items):
+            for type, value, position in item.tokens:
+                if type == "error":
+                    raise self.parser.lexer.located(value, self.text, self.__start(index) + position)
+                yield (type, value)
+
+    def tables(self) -> dict:
+        # latest value of each definition, in order of first definition: same as AJSParser.tables() after a full parse
+        tables = {"type": {}, "function": {}, "variable": {}}
+        for (kind, name), versions in sorted(self.__versions.items(), key=lambda version: version[1][0].order):
+            tables[kind][name] = versions[-1].writes[(kind, name)]
+        return {"symbols": {name: value[0] for name, value in tables["type"].items()},
+            "functions": tables["function"], "registers": tables["variable"]}
+
+    # LEXING
+    def __split(self, window: str, boundary: int) -> Optional[List[AJSItem]]:
+        # items of `window` up to `boundary`, None if no item starts right there
+        tokens = self.__lex(window)
+        firsts = self.__segment(tokens)
+        starts = [0] + [tokens[index][2] for index in firsts[1:]]  # leading text goes with the first item
+        if boundary < len(window):
+            if boundary not in starts[1:]:
+                return None
+            for position, comment in _unclosed(window, tokens):  # the text after the window can close them
+                if position < boundary and (comment or window.find("\n", position, boundary) == -1):
+                    return None
+            cut = starts.index(boundary, 1)
+            firsts, starts = firsts[:cut + 1], starts[:cut + 1]
+        else:
+            firsts, starts = firsts + [len(tokens)], starts + [len(window)]
+
+        items = []
+        for index in range(len(firsts) - 1):
+            begin = starts[index]
+            items.append(AJSItem(window[begin:starts[index + 1]], [(type, value, position - begin)
+                for type, value, position in tokens[firsts[index]:firsts[index + 1]]]))
+        return items
+
+    def __lex(self, window: str) -> List[Tuple[str, Any, int]]:
+        # illegal characters are skipped, their errors stay in the token list: raised when the parser gets there
+        lexer = self.parser.lexer.lexer
+        lexer.lineno = 1
+        lexer.input(window)
+        tokens = []
+        while True:
+            try:
+                t = lexer.token()
+            except ValueError as e:
+                tokens.append(("error", e, lexer.lexpos))
+                lexer.lexpos += 1
+                continue
+            if t is None:
+                return tokens
+            tokens.append((t.type, t.value, t.lexpos))
+
+    def __segment(self, tokens: List[Tuple[str, Any, int]]) -> List[int]:
+        # index of the first token of each item: `;` ends statements, the last `}` ends if, while & function blocks
+        firsts, depth = [0], 0
+        for index, (type, _, _) in enumerate(tokens):
+            if type == '{':
+                depth += 1
+            elif type == '}':
+                depth -= 1
+            if depth < 0 or depth == 0 and (type == ';' or type == '}' and tokens[firsts[-1]][0] in BLOCKS
+                    and (index + 1 == len(tokens) or tokens[index + 1][0] != "ELSE")):
+                depth = 0
+                firsts.append(index + 1)
+        if len(firsts) > 1 and firsts[-1] == len(tokens):
+            firsts.pop()
+        return firsts
+
+    def __reopened(self, first: int, start: int) -> int:
+        # first item to relex: an unterminated comment before it, or a quote on the line of the edit, can be closed now
+        last = self.__locate(start)
+        for item in sorted(self.__errors, key=ORDER):
+            index = bisect_left(self.__items, item.order, key=ORDER)
+            if index >= first:
+                break
+            lines = [item.text] + [other.text for other in self.__items[index + 1:last]] + [self.__items[last].text[:start - self.__start(last)]]
+            for position, comment in _unclosed(item.text, item.tokens):
+                if comment or not any("\n" in text for text in [lines[0][position:]] + lines[1:]):
+                    return index
+        return first
+
+    # POSITIONS
+    def __start(self, index: int) -> int:
+        return self.__starts[index] + (self.__lag if index >= self.__pivot else 0)
+
+    def __locate(self, offset: int) -> int:
+        # item containing `offset`, the last one for the end of the source
+        if self.__pivot < len(self.__starts) and offset >= self.__start(self.__pivot):
+            return bisect_right(self.__starts, offset - self.__lag, self.__pivot) - 1
+        return bisect_right(self.__starts, offset, 0, self.__pivot) - 1
+
+    def __replace(self, first: int, last: int, items: List[AJSItem]) -> int:
+        # items[first:last] -> items: unchanged items at both ends keep their analysis
+        old = self.__items[first:last]
+        same = 0
+        while same < min(len(old), len(items)) and old[same].text == items[same].text:
+            items[same] = old[same]
+            same += 1
+        kept = 0
+        while kept < min(len(old), len(items)) - same and old[len(old) - kept - 1].text == items[len(items) - kept - 1].text:
+            items[len(items) - kept - 1] = old[len(old) - kept - 1]
+            kept += 1
+        removed, added = old[same:len(old) - kept], items[same:len(items) - kept]
+
+        # offsets: the items after keep one pending shift while edits stay in the same place
+        starts = [self.__start(first)]
+        for item in items[:-1]:
+            starts.append(starts[-1] + len(item.text))
+        if self.__pivot != last and self.__lag:
+            self.__starts[self.__pivot:] = [start + self.__lag for start in self.__starts[self.__pivot:]]
+            self.__lag = 0
+        self.__lag += sum([len(item.text) for item in items]) - sum([len(item.text) for item in old])
+        self.__items[first:last] = items
+        self.__starts[first:last] = starts
+        self.__pivot = first + len(items)
+
+        # order keys between the neighbours, all renumbered when there is no room left
+        position = first + same
+        low = self.__items[position - 1].order if position else 0
+        high = self.__items[position + len(added)].order if position + len(added) < len(self.__items) else low + GAP * (len(added) + 1)
+        step = (high - low) // (len(added) + 1)
+        if step:
+            for index, item in enumerate(added):
+                item.order = low + step * (index + 1)
+        else:
+            for index, item in enumerate(self.__items):
+                item.order = (index + 1) * GAP
+
+        # semantic analysis: new items, then items reading a definition that changed
+        before, shared = {}, {}
+        for item in removed:
+            before.update(item.writes)
+            shared.update(item.aliases)
+            self.__drop(item)
+        after, aliases = {}, {}
+        for item in added:
+            self.__analyze(item)
+            after.update(item.writes)
+            aliases.update(item.aliases)
+        bound = added[-1].order if added else low
+        return len(added) + self.__propagate(self.__changed(before, after, shared, aliases), bound)
+
+    # SEMANTIC ANALYSIS
+    def __propagate(self, names: Set[str], bound: int) -> int:
+        # items after `bound` reading changed definitions, in source order
+        queue, queued, count = [], set(), 0
+        while True:
+            for name in names:
+                readers = self.__readers.get(name, [])
+                for item in readers[bisect_right(readers, bound, key=ORDER):]:
+                    if item.order not in queued:
+                        queued.add(item.order)
+                        heapq.heappush(queue, (item.order, item))
+            if not queue:
+                return count
+            bound, item = heapq.heappop(queue)
+            before, shared = item.writes, item.aliases
+            self.__analyze(item)
+            names = self.__changed(before, item.writes, shared, item.aliases)
+            count += 1
+
+    def __analyze(self, item: AJSItem):
+        # parse the item alone, with the definitions visible right before it
+        self.__drop(item)
+        names = {value for type, value, _ in item.tokens if type == "STRING_IMPLICIT"}
+        # variables sharing an object with the ones read: changed in place with them while no other item assigns them
+        aliased = set()
+        for name in list(names):
+            writer = self.__writer(("variable", name), item)
+            if writer is not None:
+                for alias in writer.aliases.get(name, ()):
+                    aliased.add(alias)
+                    if self.__writer(("variable", alias), item) is writer:
+                        names.add(alias)
+        entries, copies = {}, {}
+        for name in names:
+            for kind in KINDS:
+                value = self.__before((kind, name), item)
+                if value is not None:
+                    entries[(kind, name)] = _copy(value, copies) if kind == "variable" else value
+
+        # types of those definitions, nested object types included
+        types = [name for kind, name in entries if kind == "type"]
+        for (kind, _), value in list(entries.items()):
+            if kind == "variable":
+                types.append(value.type)
+            elif kind == "function":
+                types += [value.type] + list(value.value.values())
+        seen = set()
+        while types:
+            name = types.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            value = entries.get(("type", name)) or self.__before(("type", name), item)
+            if value is not None:
+                entries[("type", name)] = value
+                names.add(name)
+                types += [layout.name for layout in value[1].layouts if layout is not None]
+
+        item.reads, item.writes, item.aliases = names | aliased, {}, {}
+        values = {key: str(value) for key, value in entries.items() if key[0] == "variable"}  # changed in place || not
+        shared = _aliases({name: value for (kind, name), value in entries.items() if kind == "variable"})
+        self.parser.reset()
+        self.parser.define(entries)
+        tokens = AJSTokenList(item.tokens)
+        try:
+            self.parser.load(tokens)
+        except Exception as e:
+            item.error = e
+            # illegal character of the item || token the parser stopped at || first token of the production
+            item.failure = next((position for type, value, position in item.tokens if value is e), getattr(e, "offset", None))
+            item.ended = tokens.ended and isinstance(e, AJSSemanticError)  # raised when its production is reduced
+        else:
+            item.error, item.failure, item.ended = None, None, False
+            results = self.parser.entries()
+            item.writes = {key: value for key, value in results.items()
+                if key not in entries or entries[key] != value or key in values and values[key] != str(value)}
+            # shared objects are written together: the next items get them from one item, still shared
+            aliases = _aliases({name: value for (kind, name), value in results.items() if kind == "variable"})
+            item.writes.update({("variable", name): results[("variable", name)] for name in aliases.keys() | shared.keys()
+                if aliases.get(name) != shared.get(name)})
+            item.aliases = {name: group for name, group in aliases.items() if any(("variable", alias) in item.writes for alias in group)}
+            for group in item.aliases.values():
+                item.writes.update({("variable", alias): results[("variable", alias)] for alias in group})
+        self.__add(item)
+
+    def __before(self, key: Tuple[str, str], item: AJSItem) -> Any:
+        writer = self.__writer(key, item)
+        return None if writer is None else writer.writes[key]
+
+    def __writer(self, key: Tuple[str, str], item: AJSItem) -> Optional[AJSItem]:
+        # last item before `item` defining || assigning `key`
+        versions = self.__versions.get(key)
+        if versions:
+            index = bisect_left(versions, item.order, key=ORDER)
+            if index:
+                return versions[index - 1]
+        return None
+
+    def __changed(self, before: Dict[Tuple[str, str], Any], after: Dict[Tuple[str, str], Any],
+            shared: Dict[str, frozenset], aliases: Dict[str, frozenset]) -> Set[str]:
+        # names whose definition seen by the next items is different, || shared with other variables now || no more
+        return {name for kind, name in before.keys() | after.keys()
+            if not _same(kind, before.get((kind, name)), after.get((kind, name)))} | \
+            {name for name in shared.keys() | aliases.keys() if shared.get(name) != aliases.get(name)}
+
+    # AUXILAR METHODS
+    def __add(self, item: AJSItem):
+        for key in item.writes:
+            insort(self.__versions.setdefault(key, []), item, key=ORDER)
+        for name in item.reads:
+            insort(self.__readers.setdefault(name, []), item, key=ORDER)
+        if item.error is not None:
+            self.__errors.add(item)
+
+    def __drop(self, item: AJSItem):
+        for table, keys in [(self.__versions, item.writes), (self.__readers, item.reads)]:
+            for key in keys:
+                items = table[key]
+                del items[bisect_left(items, item.order, key=ORDER)]
+                if not items:
+                    del table[key]
+        self.__errors.discard(item)
+
+
+def _unclosed(text: str, tokens: List[Tuple[str, Any, int]]) -> Iterator[Tuple[int, bool]]:
+    # lexer errors the text after them can undo: (position, unterminated comment || quote without its closing)
+    for type, _, position in tokens:
+        if type == "error" and (text[position] in "\"'" or text.startswith("/*", position)):
+            yield (position, text[position] == "/")
+
+
+def _copy(value: AJSObject, copies: Dict[int, Any]) -> AJSObject:
+    # object values are changed in place by attribute assignments: values shared before are shared in the copies
+    if id(value) not in copies:
+        if isinstance(value.value, AJSStruct):
+            struct = value.value
+            if id(struct) not in copies:
+                copies[id(struct)] = AJSStruct(struct.layout, [])
+                copies[id(struct)].slots = [_copy(slot, copies) for slot in struct.slots]
+            copies[id(value)] = AJSObject(value.type, copies[id(struct)])
+        else:
+            copies[id(value)] = AJSObject(value.type, value.value)
+    return copies[id(value)]
+
+
+def _aliases(values: Dict[str, AJSObject]) -> Dict[str, frozenset]:
+    # variables sharing an object || a struct at any depth: name -> all of them, for groups of two || more
+    owners, groups = {}, {name: {name} for name in values}
+    for name, value in values.items():
+        stack = [value]
+        while stack:
+            value = stack.pop()
+            shared = [value, value.value] if isinstance(value.value, AJSStruct) else [value]
+            for key in map(id, shared):
+                owner = owners.setdefault(key, name)
+                if groups[owner] is not groups[name]:  # merge both groups
+                    groups[owner].update(groups[name])
+                    for alias in groups[name]:
+                        groups[alias] = groups[owner]
+            if isinstance(value.value, AJSStruct):
+                stack += value.value.slots
+    return {name: frozenset(group) for name, group in groups.items() if len(group) > 1}
+
+
+def _same(kind: str, before: Any, after: Any) -> bool:
+    if before is None or after is None:
+        return before is after
+    if kind == "type":  # same fields & the same nested layouts
+        return str(before[0]) == str(after[0]) and all(old is new for old, new in zip(before[1].layouts, after[1].layouts))
+    return str(before) == str(after)
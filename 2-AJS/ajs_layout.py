@@ -0,0 +1,68 @@
+import itertools
+from typing import Any, Dict, List, Tuple
+
+# layout ids are never reused, equal ids are the same type definition
+LAYOUT_IDS = itertools.count()
+
+
+class AJSLayout:
+    __slots__ = ("id", "name", "fields", "offsets", "types", "layouts", "paths", "shapes")
+
+    def __init__(self, name: str, fields: Dict[str, str], layouts: Dict[str, "AJSLayout"]):
+        # one slot per field, in definition order: offset, type name & layout of object fields
+        self.id = next(LAYOUT_IDS)
+        self.name = name
+        self.fields = tuple(fields)
+        self.offsets = {key: offset for offset, key in enumerate(self.fields)}
+        self.types = tuple(fields.values())
+        self.layouts = tuple(layouts.get(type) for type in self.types)
+        self.paths = {}  # attribute keys -> (offsets, type)
+        self.shapes = {}  # object literal keys -> offsets
+
+    def path(self, keys: Tuple[str, ...]) -> Tuple[Tuple[int, ...], str]:
+        # raises KeyError for keys not in the layout
+        if keys not in self.paths:
+            layout, offsets, type = self, [], self.name
+            for key in keys:
+                if layout is None:  # attribute of a field that is not an object
+                    raise KeyError(key)
+                offsets.append(layout.offsets[key])
+                type = layout.types[offsets[-1]]
+                layout = layout.layouts[offsets[-1]]
+            self.paths[keys] = (tuple(offsets), type)
+        return self.paths[keys]
+
+    def shape(self, keys: Tuple[str, ...]) -> Tuple[int, ...]:
+        # slot of each object literal item, raises KeyError for a different set of keys
+        if keys not in self.shapes:
+            if len(keys) != len(self.fields):
+                raise KeyError(keys)
+            self.shapes[keys] = tuple(self.offsets[key] for key in keys)
+        return self.shapes[keys]
+
+    def render(self, slots: Any) -> Any:
+        # slot arrays of the VM as {key: value} dictionaries
+        if not isinstance(slots, list):
+            return slots
+        return {key: value if layout is None else layout.render(value)
+            for key, value, layout in zip(self.fields, slots, self.layouts)}
+
+    def __str__(self) -> str:
+        return f"({self.id}, {self.name})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class AJSStruct:
+    __slots__ = ("layout", "slots")
+
+    def __init__(self, layout: AJSLayout, slots: List[Any]):
+        self.layout = layout
+        self.slots = slots
+
+    def __str__(self) -> str:
+        return str(dict(zip(self.layout.fields, self.slots)))
+
+    def __repr__(self) -> str:
+        return self.__str__()
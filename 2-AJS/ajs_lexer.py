@@ -1,12 +1,44 @@
 import os
-import re
+import mmap
 from decimal import Decimal
-from ply.lex import lex, TOKEN
+from typing import Optional, Tuple, Union
+from ply.lex import TOKEN, LexToken
+from ajs_tables import build_lexer
+from ajs_tokens import AJSTokenBuffer
+from ajs_source import AJSSourceLexer, open_source
+from ajs_cache import AJSResultCache
+from ajs_profile import OFF
+from ajs_lines import AJSLineIndex
+from ajs_errors import AJSError
+
+# scientific REAL literals: exact = Decimal || fast = float
+NUMBERS = os.environ.get("AJS_NUMBERS", "exact")
+# base of a 0-prefixed INTEGER literal from its second character, octal otherwise
+BASES = {"b": 2, "B": 2, "x": 16, "X": 16}
+
+
+def output_stem(file_path: str, output: Optional[str] = None) -> str:
+    # ./output/<output> without extension, the file name by default: its directories are created
+    stem = os.path.join("./output", os.path.splitext(os.path.basename(file_path))[0] if output is None else output)
+    os.makedirs(os.path.dirname(stem), exist_ok=True)  # concurrent batch workers
+    return stem
 
 
 class AJSLexer:
-    def __init__(self):
-        self.lexer = lex(module=self)
+    def __init__(self, numbers: str = NUMBERS):
+        # ERROR HANDLING
+        if numbers not in ["exact", "fast"]:
+            raise ValueError(f"INCORRECT NUMERIC POLICY:\n"
+                f"# PROVIDED: {numbers}\n"
+                f"# EXPECTED: exact || fast")
+
+        self.numbers = numbers
+        self.__scientific = Decimal if numbers == "exact" else float
+        self.lexer = build_lexer(self)
+        self.source = AJSSourceLexer(self)  # same rules over memory-mapped files
+        self.cache = AJSResultCache()
+        self.profiler = OFF  # AJSProfiler.instrument() to measure
+        self.__lines = None  # line index of the last input located
     
     # DEFINE LITERALS
     literals = ['{', '}', '(', ')', '[', ']', ':', ',', '.', ';']
@@ -102,30 +134,35 @@ class AJSLexer:
         t.value = ord(t.value[1:-1])
         return t
 
+    # block comments: only the opening matched by the master regex, the closing found in one linear search
     def t_comment(self, t):
-        r'(\/\/.*)|(\/\*(?:(?!\*\/).|\n)*\*\/)'
-        pass
+        r'\/\/.*|\/\*'
+        if t.value == "/*":
+            data = t.lexer.lexdata
+            end = data.find("*/" if isinstance(data, str) else b"*/", t.lexer.lexpos)
+            if end == -1:  # unterminated: nothing else to scan
+                t.lexer.lexpos = t.lexpos
+                raise AJSError(f"[ERROR][LEXER]: Unterminated comment:\n"
+                    f"# PROVIDED: /*\n"
+                    f"# EXPECTED: */", t.lexpos)
+            t.lexer.lineno += data[t.lexer.lexpos:end].count("\n" if isinstance(data, str) else b"\n")
+            t.lexer.lexpos = end + 2
 
+    # numbers are classified by their characters: the master regex already matched them
     @TOKEN(real)
     def t_REAL(self, t):
-        match = re.fullmatch(self.real, t.value)
-        if match.group(1):  # arbitrary precision
-            t.value = Decimal(match.group(1))
+        if "e" in t.value or "E" in t.value:  # scientific: arbitrary precision || float
+            t.value = self.__scientific(t.value)
         else:  # single precision
-            t.value = float(match.group(2))
+            t.value = float(t.value)
         return t
 
     @TOKEN(integer)
     def t_INTEGER(self, t):
-        match = re.fullmatch(self.integer, t.value)
-        if match.group(1):  # base 2
-            t.value = int(match.group(1), 2)
-        elif match.group(2):  # base 8
-            t.value = int(match.group(2), 8)
-        elif match.group(3):  # base 16
-            t.value = int(match.group(3), 16)
-        else:  # base 10
-            t.value = int(match.group(4))
+        if t.value[0] != "0" or len(t.value) == 1:  # base 10
+            t.value = int(t.value)
+        else:  # base 2 || base 16 || base 8
+            t.value = int(t.value, BASES.get(t.value[1], 8))
         return t
 
     # INPUT BEHAVIOR
@@ -133,30 +170,62 @@ class AJSLexer:
 
     def t_newline(self, t):
         r'\n|\r\n?'
-        t.lexer.lineno = t.value.count(os.linesep)
+        t.lexer.lineno += 1
 
     # ERROR HANDLING
     def t_error(self, t):
-        raise ValueError(f"[ERROR][LEXER]: Illegal character:\n"
-            f"# PROVIDED: {t.value[0]}")
+        raise AJSError(f"[ERROR][LEXER]: Illegal character:\n"
+            f"# PROVIDED: {t.value[0]}", t.lexpos)
 
     # RUN
-    def tokenize(self, file_path: str):
+    def tokenize(self, file_path: str, output: Optional[str] = None):
         # open file
+        with open_source(file_path) as data:
+            # unchanged source: cached output
+            key = self.cache.key(f"lex:{self.numbers}", data)
+            outputs = self.cache.get(key)
+
+            # output file
+            with open(output_stem(file_path, output) + ".token", 'w', encoding="UTF-8") as file:
+                if outputs is None:
+                    # tokenize
+                    with self.profiler.phase("tokenize"):
+                        lexer = self.lexer if isinstance(data, str) else self.source
+                        lexer.lineno = 1
+                        lexer.input(data)
+                        try:
+                            outputs = {"token": "\n".join([f"{t.type} {t.value}" for t in lexer])}
+                        except ValueError as e:
+                            raise self.located(e, data) from None
+                    self.cache.put(key, outputs)
+                with self.profiler.phase("output"):
+                    file.write(outputs["token"])
+
+    def buffer(self, data: Union[str, mmap.mmap, bytes]) -> AJSTokenBuffer:
+        # compact token columns instead of one LexToken per token
         try:
-            with open(file_path, 'r', encoding="UTF-8") as file:
-                data = file.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"FILE PATH NOT EXIST:\n"
-                f"# PROVIDED: {file_path}")
-        
-        # tokenize
-        self.lexer.input(data)
-        
-        # output directory
-        if not os.path.exists("./output/"):
-            os.makedirs("./output/")
-
-        # output file
-        with open("./output/" + os.path.splitext(os.path.basename(file_path))[0] + ".token", 'w', encoding="UTF-8") as file:
-            file.write("\n".join([f"{t.type} {t.value}" for t in self.lexer]))
+            return AJSTokenBuffer(self, data)
+        except ValueError as e:
+            raise self.located(e, data) from None
+
+    # POSITIONS
+    def lines(self, data: Union[str, mmap.mmap, bytes]) -> AJSLineIndex:
+        # line index of `data`, built once per input
+        if self.__lines is None or self.__lines.data is not data:
+            self.__lines = AJSLineIndex(data)
+        return self.__lines
+
+    def location(self, data: Union[str, mmap.mmap, bytes], t: LexToken) -> Tuple[int, int]:
+        # (line, column) of a token lexed from `data`
+        return self.lines(data).position(t.lexpos)
+
+    def located(self, error: ValueError, data: Union[str, mmap.mmap, bytes], offset: Optional[int] = None) -> ValueError:
+        # error with the line & column of `offset` in `data`, its own offset by default, as it is without offset
+        if offset is None:
+            offset = getattr(error, "offset", None)
+        if offset is None:
+            return error
+        line, column = self.lines(data).position(offset)
+        if isinstance(error, AJSError):  # same kind of error, offset in `data`
+            return error.__class__(f"{error}\n# POSITION: line {line}, column {column}", offset)
+        return ValueError(f"{error}\n# POSITION: line {line}, column {column}")
\ No newline at end of file
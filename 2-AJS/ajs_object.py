@@ -1,19 +1,40 @@
-from typing import Any
+from typing import Any, Union
 
+# interned type names: small integer tags for the built-in types only
+TYPES = ["INT", "FLOAT", "CHARACTER", "BOOLEAN", "NULL", "OBJECT"]
+TAGS = {name: tag for tag, name in enumerate(TYPES)}
 
-class AJSObject:
-    def __init__(self, type: str, value: Any):
+
+def type_tag(type: str) -> Union[int, str]:
+    # object type names & operator names are their own tag: nothing outlives the objects of a parser session
+    try:
+        return TAGS[type]
+    except (KeyError, TypeError):
         # ERROR HANDLING
         if not isinstance(type, str):
             raise TypeError(f"INCORRECT TYPE FOR `type`:\n"
-                f"# PROVIDED: {type(type)}\n"
+                f"# PROVIDED: {type.__class__}\n"
                 f"# EXPECTED: `str`")
-        
-        self.type = type
+        return type
+
+
+class AJSObject:
+    __slots__ = ("tag", "value")
+
+    def __init__(self, type: str, value: Any):
+        self.tag = type_tag(type)
         self.value = value
-    
+
+    @property
+    def type(self) -> str:
+        return TYPES[self.tag] if self.tag.__class__ is int else self.tag
+
+    @type.setter
+    def type(self, type: str):
+        self.tag = type_tag(type)
+
     def __str__(self) -> str:
         return f"({self.type}, {self.value})"
-    
+
     def __repr__(self) -> str:
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
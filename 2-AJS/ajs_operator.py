@@ -1,8 +1,13 @@
-from typing import Any, List, Union
-from ajs_object import AJSObject
+import operator
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Tuple, Union
+from ajs_object import AJSObject, type_tag
+from ajs_errors import AJSSemanticError
 
 
 class AJSOperator(AJSObject):
+    __slots__ = ()
+
     _type_map = {
         "PLUS": {
             "INT": "INT",
@@ -62,8 +67,34 @@ class AJSOperator(AJSObject):
 
     _type_conversions = ["CHARACTER", "INT", "FLOAT"]
 
+    _functions = {
+        "PLUS": (operator.pos, operator.add),
+        "MINUS": (operator.neg, operator.sub),
+        "TIMES": (None, operator.mul),
+        "DIVIDE": (None, operator.truediv),
+        "LE": (None, operator.le),
+        "LT": (None, operator.lt),
+        "GE": (None, operator.ge),
+        "GT": (None, operator.gt),
+        "EQ": (None, operator.eq),
+        "AND": (None, lambda left, right: left and right),
+        "OR": (None, lambda left, right: left or right),
+        "NOT": (operator.not_, None)
+    }
+
+    _instances = {}
+
     def __init__(self, type: str, value: Any):
         super().__init__(type, value)
+
+    @classmethod
+    def instance(cls, type: str, value: Any) -> "AJSOperator":
+        # operators hold no state: one shared object per operator & symbol
+        try:
+            return cls._instances[type, value]
+        except KeyError:
+            cls._instances[type, value] = cls(type, value)
+            return cls._instances[type, value]
     
     def evaluate(self, operands: List[AJSObject]) -> AJSObject:
         # ERROR HANDLING
@@ -80,38 +111,59 @@ class AJSOperator(AJSObject):
         
         # unary operators
         if len(operands) == 1:
+            operation = _UNARY.get((self.tag, operands[0].tag))
+            if operation is None:
+                raise AJSSemanticError(f"[ERROR][SEMANTIC]: Operaion not supported: {self.value} {operands[0].value}")
+            type, function = operation
             try:
-                type = self._type_map[self.type][operands[0].type]
-                return AJSObject(type, eval(f"{self.value} {operands[0].value}"))
-            except KeyError:
-                raise ValueError(f"[ERROR][SEMANTIC]: Operaion not supported: {self.value} {operands[0].value}")
+                return AJSObject(type, function(operands[0].value))
             except TypeError:  # cannot calculate value
                 return AJSObject(type, None)
         # binary operators
         else:
+            operation = _BINARY.get((self.tag, operands[0].tag, operands[1].tag))
+            if operation is None:
+                raise AJSSemanticError(f"[ERROR][SEMANTIC]: Operaion not supported: {operands[0].value} {self.value} {operands[1].value}")
+            type, cast, function = operation
+            if cast is not None and operands[cast[0]].value is not None:  # value not known at parse time
+                operands[cast[0]].value = cast[1](operands[cast[0]].value)
             try:
-                type = self.__common_type(operands)
-                return AJSObject(type, eval(f"{operands[0].value} {self.value} {operands[1].value}"))
-            except KeyError:
-                raise ValueError(f"[ERROR][SEMANTIC]: Operaion not supported: {operands[0].value} {self.value} {operands[1].value}")
+                return AJSObject(type, function(operands[0].value, operands[1].value))
             except TypeError:  # cannot calculate value
                 return AJSObject(type, None)
-    
-    def __common_type(self, operands: List[AJSObject]) -> str:
-        try:
-            first_retype = self._type_map[self.type][operands[0].type]
-            second_retype = self._type_map[self.type][operands[1].type]
-            if self._type_conversions.index(first_retype) >= self._type_conversions.index(second_retype):
-                self.__type_cast(operands[0].type, operands[1])
-                return operands[0].type
-            else:
-                self.__type_cast(operands[1].type, operands[0])
-                return operands[1].type
-        except ValueError:
-            return first_retype  # == second_retype
-    
-    def __type_cast(self, type: str, operand: AJSObject):
-        if type == "FLOAT":
-            operand.value = float(operand.value)
-        if type == "INT":
-            operand.value = int(operand.value)
+
+
+def _float(function: Callable) -> Callable:
+    # FLOAT literals are Decimal: computed as the float they read as
+    def wrapper(*values: Any) -> Any:
+        return function(*[float(value) if isinstance(value, Decimal) else value for value in values])
+    return wrapper
+
+
+def _operations() -> Tuple[Dict[Tuple[int, int], tuple], Dict[Tuple[int, int, int], tuple]]:
+    # (operator, operand type tag) -> (result type, function) &
+    # (operator, left type tag, right type tag) -> (result type, (cast operand, cast) or None, function)
+    conversions = AJSOperator._type_conversions
+    casts = {"FLOAT": float, "INT": int, "CHARACTER": None}
+    unary, binary = {}, {}
+    for name, types in AJSOperator._type_map.items():
+        unary_function, binary_function = AJSOperator._functions[name]
+        for left, left_retype in types.items():
+            if unary_function is not None:
+                unary[type_tag(name), type_tag(left)] = (left_retype, _float(unary_function) if left == "FLOAT" else unary_function)
+            if binary_function is None:
+                continue
+            for right, right_retype in types.items():
+                function = _float(binary_function) if "FLOAT" in [left, right] else binary_function
+                if left_retype not in conversions or right_retype not in conversions:
+                    binary[type_tag(name), type_tag(left), type_tag(right)] = (left_retype, None, function)  # == right_retype
+                elif conversions.index(left_retype) >= conversions.index(right_retype):
+                    cast = casts.get(left)
+                    binary[type_tag(name), type_tag(left), type_tag(right)] = (left, None if cast is None else (1, cast), function)
+                else:
+                    cast = casts.get(right)
+                    binary[type_tag(name), type_tag(left), type_tag(right)] = (right, None if cast is None else (0, cast), function)
+    return unary, binary
+
+
+_UNARY, _BINARY = _operations()
@@ -0,0 +1,138 @@
+from typing import List, Set
+from ajs_ast import AJSNode
+from ajs_object import AJSObject
+from ajs_operator import AJSOperator
+
+
+class AJSOptimizer:
+    def __init__(self):
+        self.report = []  # one line per folded expression, removed statement & propagated constant
+
+    # RUN
+    def optimize(self, ast: AJSNode) -> AJSNode:
+        # rewrites the AST in place, the compiler takes the result
+        self.report = []
+        if ast is None:
+            return None
+        before = self.size(ast)
+        changes = None
+        while changes != len(self.report):  # removed code can turn more lets into constants
+            changes = len(self.report)
+            self.__globals = self.__constants = {}  # name -> const node, visible in the scope being optimized
+            self.__candidates = self.__single_assignments(ast, [])
+            ast.children = self.__block(ast.children, True)
+        self.report.append(f"NODES: {before} -> {self.size(ast)}")
+        return ast
+
+    def size(self, node: AJSNode) -> int:
+        count, stack = 0, [node]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack += node.children
+        return count
+
+    # STATEMENTS
+    def __block(self, statements: List[AJSNode], scope: bool) -> List[AJSNode]:
+        # scope: statements run once & in order, at the top of the file or of a function body
+        children = []
+        for statement in statements:
+            children += self.__statement(statement, scope)
+        return children
+
+    def __statement(self, node: AJSNode, scope: bool) -> List[AJSNode]:
+        if node.kind == "block":
+            node.children = self.__block(node.children, scope)
+        elif node.kind == "let":
+            node.children = [self.__expression(child) for child in node.children]
+            if scope and node.children and node.children[0].kind == "const":
+                for name in node.value:
+                    if name in self.__candidates:
+                        self.__constants[name] = node.children[0]
+        elif node.kind in ["assign", "set"]:
+            node.children = [self.__expression(child) for child in node.children]
+        elif node.kind == "expression":
+            node.children[0] = self.__expression(node.children[0])
+            if node.children[0].kind in ["const", "name"]:  # nothing to run
+                self.report.append(f"REMOVED: expression statement {node.children[0].value!r}")
+                return []
+        elif node.kind == "if":
+            node.children[0] = condition = self.__expression(node.children[0])
+            if condition.kind == "const":
+                branch = 1 if condition.value else 2
+                removed = "condition" if condition.value and len(node.children) == 2 else ["", "else", "then"][branch] + " branch"
+                self.report.append(f"REMOVED: if ({condition.value!r}) {removed}")
+                dead = self.__dead(node.children[3 - branch:4 - branch])
+                return dead + ([] if branch == len(node.children) else self.__block(node.children[branch].children, scope))
+            node.children[1:] = [self.__statement(child, False)[0] for child in node.children[1:]]
+        elif node.kind == "while":
+            node.children[0] = condition = self.__expression(node.children[0])
+            if condition.kind == "const" and not condition.value:
+                self.report.append(f"REMOVED: while ({condition.value!r}) loop")
+                return self.__dead(node.children[1:])
+            node.children[1] = self.__statement(node.children[1], False)[0]
+        elif node.kind == "function":
+            # global constants are never function locals, local constants end with the body
+            constants, candidates = self.__constants, self.__candidates
+            self.__constants = dict(self.__globals)
+            self.__candidates = self.__single_assignments(node.children[0], node.value[1])
+            node.children[0] = self.__statement(node.children[0], True)[0]
+            node.children[1] = self.__expression(node.children[1])
+            self.__constants, self.__candidates = constants, candidates
+        return [node]
+
+    # EXPRESSIONS
+    def __expression(self, node: AJSNode) -> AJSNode:
+        node.children = [self.__expression(child) for child in node.children]
+        if node.kind == "name" and node.value in self.__constants:
+            constant = self.__constants[node.value]
+            self.report.append(f"PROPAGATED: {node.value} = {constant.value!r}")
+            return AJSNode("const", constant.value, type=constant.type)
+        if node.kind not in ["unary", "binary"]:
+            return node
+        if node.value in ["AND", "OR"] and node.children[0].kind == "const":
+            # short-circuit: the left operand decides which operand is the value
+            left, right = node.children
+            self.report.append(f"FOLDED: {node.value} on constant {left.value!r}")
+            return left if bool(left.value) == (node.value == "OR") else right
+        if any(child.kind != "const" for child in node.children):
+            return node
+        try:
+            value = AJSOperator.instance(node.value, None).evaluate([AJSObject(child.type, child.value) for child in node.children])
+        except ZeroDivisionError:  # left for the runtime error
+            return node
+        if value.value is None:  # cannot calculate value
+            return node
+        self.report.append(f"FOLDED: {node.kind} {node.value} -> {value.value!r}")
+        return AJSNode("const", value.value, type=node.type)
+
+    # AUXILAR METHODS
+    def __dead(self, statements: List[AJSNode]) -> List[AJSNode]:
+        # removed code still declares its let names: globals & function locals stay what they were
+        kept, stack = [], list(reversed(statements))
+        while stack:
+            node = stack.pop()
+            if node.kind in ["let", "declare"]:
+                kept.append(AJSNode("declare", node.value))
+                kept[-1].address = node.address
+            elif node.kind in ["block", "if", "while"]:
+                stack += reversed(node.children)
+        return kept
+
+    def __single_assignments(self, node: AJSNode, arguments: List[str]) -> Set[str]:
+        # names declared by a single let and never assigned, looking into nested functions too
+        declarations, assigned = {}, set(arguments)
+        stack = list(node.children)
+        while stack:
+            node = stack.pop()
+            if node.kind in ["let", "declare"]:
+                for name in node.value:
+                    declarations[name] = declarations.get(name, 0) + 1
+            elif node.kind == "assign":
+                assigned.add(node.value)
+            elif node.kind == "set":
+                assigned.add(node.children[0].children[0].value)
+            elif node.kind == "function":
+                assigned.update(node.value[1])
+            stack += node.children
+        return {name for name, count in declarations.items() if count == 1 and name not in assigned}
@@ -1,18 +1,34 @@
 import os
-from ply.yacc import yacc
-from ajs_lexer import AJSLexer
+import mmap
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple, Union
+from ply.lex import LexToken
+from ajs_lexer import AJSLexer, NUMBERS, output_stem
+from ajs_tokens import AJSTokenBuffer, AJSTokenList
+from ajs_source import open_source
+from ajs_lines import END
+from ajs_errors import AJSError, AJSSemanticError
+from ajs_tables import build_parser
 from ajs_object import AJSObject
 from ajs_operator import AJSOperator
+from ajs_ast import AJSNode
+from ajs_layout import AJSLayout, AJSStruct
+from ajs_scope import AJSSymbolTable
+from ajs_optimizer import AJSOptimizer
+from ajs_compiler import AJSCompiler
+from ajs_vm import AJSVM
+from ajs_profile import OFF
 
 
 class AJSParser:
-    def __init__(self):
-        self.parser = yacc(module=self)
-        self.__symbols = {}
-        self.__functions = {}
-        self.__registers = {}
+    def __init__(self, numbers: str = NUMBERS):
+        self.lexer = AJSLexer(numbers)
+        self.parser = build_parser(self)
+        self.profiler = OFF  # AJSProfiler.instrument() to measure
+        self.reset()
 
-    tokens = AJSLexer().tokens
+    tokens = AJSLexer.tokens
 
     # DEFINE TOKEN PRECEDENCE
     precedence = (
@@ -27,10 +43,15 @@ class AJSParser:
     # DEFINE PRODUCTION RULES
     def p_file(self, p):
         """
-        file : statement file
-            | block file
+        file : file statement
+            | file block
             | empty
         """
+        if len(p) == 3:
+            self.ast = self.__node(p, self.__child(p, 1))
+            self.ast.children.append(self.__child(p, 2))
+        else:
+            self.ast = self.__node(p, AJSNode("block"))
     
     def p_statement(self, p):
         """
@@ -39,46 +60,59 @@ class AJSParser:
             | definition ';'
             | expression ';'
         """
+        if p.slice[1].type == "expression":  # value is dropped
+            self.__node(p, AJSNode("expression", children=[self.__child(p, 1)]))
+        else:
+            self.__node(p, self.__child(p, 1))
     
     def p_block(self, p):
         """
         block : simple_block
             | function
         """
+        self.__node(p, self.__child(p, 1))
     
     def p_simple_block(self, p):
         """
         simple_block : if_conditional
             | while_loop
         """
+        self.__node(p, self.__child(p, 1))
     
     def p_block_body(self, p):
         """
         block_body : block_body_nonempty
             | empty
         """
+        self.__node(p, self.__child(p, 1) or AJSNode("block"))
     
     def p_block_body_nonempty(self, p):
         """
-        block_body_nonempty : statement block_body_nonempty
-            | simple_block block_body_nonempty
+        block_body_nonempty : block_body_nonempty statement
+            | block_body_nonempty simple_block
             | statement
             | simple_block
         """
+        if len(p) == 3:
+            self.__node(p, self.__child(p, 1)).children.append(self.__child(p, 2))
+        else:
+            self.__node(p, AJSNode("block", children=[self.__child(p, 1)]))
 
     def p_declaration(self, p):
         """
         declaration : LET declaration_content
         """
         p[0] = p[2]
+        self.__node(p, AJSNode("let", [item for item, _ in p[2]])).address = [address for _, address in p[2]]
     
     def p_declaration_content(self, p):
         """
-        declaration_content : item ',' declaration_content
+        declaration_content : declaration_content ',' item
             | item
         """
         if len(p) == 4:
-            p[0] = [p[1]] + p[3]
+            p[0] = p[1]
+            p[0].append(p[3])
         else:
             p[0] = [p[1]]
     
@@ -87,62 +121,67 @@ class AJSParser:
         item : STRING_IMPLICIT ':' STRING_IMPLICIT
             | STRING_IMPLICIT
         """
-        if p[1] in self.__registers:
-            raise ValueError(f"[ERROR][SEMANTIC]: Variable already declared: {p[1]}")
+        address = self.__variables.resolve(p[1])
+        if address is not None and address[0] == self.__variables.scope.depth:  # functions can hide global variables
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable already declared: {p[1]}")
         elif p[1] in self.__symbols:
-            raise ValueError(f"[ERROR][SEMANTIC]: Variable name can not be a type name: {p[1]}")
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable name can not be a type name: {p[1]}")
         if len(p) == 4:
             if p[3] not in self.__symbols:
-                raise ValueError(f"[ERROR][SEMANTIC]: Type not declared: {p[3]}")
-            self.__registers[p[1]] = AJSObject(p[3], None)
+                raise self.__semantic(p, f"[ERROR][SEMANTIC]: Type not declared: {p[3]}")
+            p[0] = (p[1], self.__variables.declare(p[1], AJSObject(p[3], None)))
         else:
-            self.__registers[p[1]] = AJSObject("NULL", None)
-        p[0] = p[1]
+            p[0] = (p[1], self.__variables.declare(p[1], AJSObject("NULL", None)))
     
     def p_declaration_assignment(self, p):
         """
         assignment : declaration ASSIGN assignment_content
         """
-        for item in p[1]:
+        for item, address in p[1]:
+            register = self.__variables[address]
             if p[3].type == "NULL":  # null assignment
-                if self.__registers[item].type in self.__symbols:
-                    p[3].type = self.__registers[item].type  # preserve type
+                if register.type in self.__symbols:
+                    p[3].type = register.type  # preserve type
                 else:
                     p[3].type = "NULL"
             elif p[3].type == "OBJECT":  # object assignment
-                if self.__registers[item].type not in self.__symbols:
-                    raise ValueError(f"[ERROR][SEMANTIC]: Variable is not declared as an object: {item}")
-                p[3].type = self.__registers[item].type  # assign object type
-                self.__type_structure(p[3])  # check object type compatibility
+                if register.type not in self.__symbols:
+                    raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable is not declared as an object: {item}")
+                p[3].type = register.type  # assign object type
+                self.__type_structure(p[3], self.__child(p, 3))  # check object type compatibility
             elif p[3].type in self.__symbols:  # object variable assignment
-                if self.__registers[item].type != p[3].type:
-                    raise ValueError(f"[ERROR][SEMANTIC]: Variable must be a compatible object: {item}")
+                if register.type != p[3].type:
+                    raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable must be a compatible object: {item}")
             else:  # other expressions
-                if self.__registers[item].type in self.__symbols:
-                    raise ValueError(f"[ERROR][SEMANTIC]: Variable value must be an object: {item}")
-            self.__registers[item] = p[3]
+                if register.type in self.__symbols:
+                    raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable value must be an object: {item}")
+            self.__variables[address] = p[3]
+        self.__node(p, AJSNode("let", [item for item, _ in p[1]], [self.__child(p, 3)])).address = [address for _, address in p[1]]
     
     def p_assignment(self, p):
         """
         assignment : STRING_IMPLICIT ASSIGN assignment_content
         """
-        if p[1] not in self.__registers:
-            raise ValueError(f"[ERROR][SEMANTIC]: Variable not declared: {p[1]}")
+        address = self.__variables.resolve(p[1])
+        if address is None:
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable not declared: {p[1]}")
+        register = self.__variables[address]
         if p[3].type == "NULL":  # null assignment
-            if self.__registers[p[1]].type in self.__symbols:
-                p[3].type = self.__registers[p[1]].type  # preserve type
+            if register.type in self.__symbols:
+                p[3].type = register.type  # preserve type
         elif p[3].type == "OBJECT":  # object assignment
-            if self.__registers[p[1]].type not in self.__symbols:
-                raise ValueError(f"[ERROR][SEMANTIC]: Variable is not declared as an object: {p[1]}")
-            p[3].type = self.__registers[p[1]].type  # assign object type
-            self.__type_structure(p[3])  # check object type compatibility
+            if register.type not in self.__symbols:
+                raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable is not declared as an object: {p[1]}")
+            p[3].type = register.type  # assign object type
+            self.__type_structure(p[3], self.__child(p, 3))  # check object type compatibility
         elif p[3].type in self.__symbols:  # object variable assignment
-            if self.__registers[p[1]].type != p[3].type:
-                raise ValueError(f"[ERROR][SEMANTIC]: Variable must be a compatible object: {p[1]}")
+            if register.type != p[3].type:
+                raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable must be a compatible object: {p[1]}")
         else:  # other expressions
-            if self.__registers[p[1]].type in self.__symbols:
-                raise ValueError(f"[ERROR][SEMANTIC]: Variable value must be an object: {p[1]}")
-        self.__registers[p[1]] = p[3]
+            if register.type in self.__symbols:
+                raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable value must be an object: {p[1]}")
+        self.__variables[address] = p[3]
+        self.__node(p, AJSNode("assign", p[1], [self.__child(p, 3)])).address = address
     
     def p_object_call_assignment(self, p):
         """
@@ -150,13 +189,14 @@ class AJSParser:
         """
         if p[3].type == "OBJECT":  # object assignment
             if p[1].type not in self.__symbols:
-                raise ValueError(f"[ERROR][SEMANTIC]: Object attribute is not declared as an object: {p[1].type}")
+                raise self.__semantic(p, f"[ERROR][SEMANTIC]: Object attribute is not declared as an object: {p[1].type}")
             p[3].type = p[1].type  # assign object type
-            self.__type_structure(p[3])  # check object type compatibility
+            self.__type_structure(p[3], self.__child(p, 3))  # check object type compatibility
         else:  # other expressions
             if p[3].type != p[1].type:  # object attribute type can not be changed
-                raise ValueError(f"[ERROR][SEMANTIC]: Invalid type for object attribute: {p[3].type} != {p[1].type}")
+                raise self.__semantic(p, f"[ERROR][SEMANTIC]: Invalid type for object attribute: {p[3].type} != {p[1].type}")
         p[1].value = p[3].value
+        self.__node(p, AJSNode("set", children=[self.__child(p, 1), self.__child(p, 3)]))
     
     def p_assignment_content(self, p):
         """
@@ -164,14 +204,17 @@ class AJSParser:
             | object
         """
         p[0] = p[1]
+        self.__node(p, self.__child(p, 1))
     
     def p_definition(self, p):
         """
         definition : TYPE STRING_IMPLICIT ASSIGN definition_object
         """
         if p[2] in self.__symbols:
-            raise ValueError(f"[ERROR][SEMANTIC]: Type already defined: {p[2]}")
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Type already defined: {p[2]}")
         self.__symbols[p[2]] = AJSObject(p[2], p[4])
+        self.__layouts[p[2]] = AJSLayout(p[2], p[4], self.__layouts)
+        self.__node(p, AJSNode("type", p[2]))
     
     def p_definition_object(self, p):
         """
@@ -181,41 +224,67 @@ class AJSParser:
     
     def p_definition_object_content(self, p):
         """
-        definition_object_content : definition_object_item ',' definition_object_content
-            | definition_object_item
-            | definition_object_item ','
+        definition_object_content : definition_object_items
+            | definition_object_items ','
         """
         p[0] = p[1]
+    
+    def p_definition_object_items(self, p):
+        """
+        definition_object_items : definition_object_items ',' definition_object_item
+            | definition_object_item
+        """
         if len(p) == 4:
-            p[0].update(p[3])
+            p[0] = p[1]
+            p[0][p[3][0]] = p[3][1]
+        else:
+            p[0] = dict([p[1]])
     
     def p_definition_object_item(self, p):
         """
         definition_object_item : key ':' type
         """
-        p[0] = {p[1]: p[3]}
+        p[0] = (p[1], p[3])
     
     def p_object(self, p):
         """
         object : '{' object_content '}'
         """
         p[0] = AJSObject("OBJECT", p[2])
+        self.__node(p, self.__child(p, 2))
     
     def p_object_content(self, p):
         """
-        object_content : object_item ',' object_content
-            | object_item
-            | object_item ','
+        object_content : object_items
+            | object_items ','
         """
         p[0] = p[1]
+        self.__node(p, self.__child(p, 1))
+    
+    def p_object_items(self, p):
+        """
+        object_items : object_items ',' object_item
+            | object_item
+        """
         if len(p) == 4:
-            p[0].update(p[3])
+            p[0] = p[1]
+            p[0][p[3][0]] = p[3][1]
+            node = self.__node(p, self.__child(p, 1))
+            if p[3][0] in node.value:  # repeated key: the last value wins, as in the object
+                node.children[node.value.index(p[3][0])] = self.__child(p, 3)
+            else:
+                node.value.append(p[3][0])
+                node.children.append(self.__child(p, 3))
+        else:
+            p[0] = dict([p[1]])
+            self.__node(p, AJSNode("object", [p[1][0]], [self.__child(p, 1)], "OBJECT"))
 
     def p_object_item(self, p):
         """
         object_item : key ':' assignment_content
         """
-        p[0] = {p[1]: p[3]}
+        p[0] = (p[1], p[3])
+        p.slice[0].node = self.__child(p, 3)  # the value, at its own position
     
     def p_key(self, p):
         """
@@ -238,60 +307,73 @@ class AJSParser:
         type : STRING_IMPLICIT
         """
         if p[1] not in self.__symbols:
-            raise ValueError(f"[ERROR][SEMANTIC]: Type not defined: {p[1]}")
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Type not defined: {p[1]}")
         p[0] = p[1]
     
     def p_if_conditional(self, p):
         """
-        if_conditional : IF '(' expression ')' '{' block_body_nonempty '}'
-            | IF '(' expression ')' '{' block_body_nonempty '}' ELSE '{' block_body_nonempty '}'
+        if_conditional : IF '(' expression ')' scoped_block_body
+            | IF '(' expression ')' scoped_block_body ELSE scoped_block_body
         """
+        self.__node(p, AJSNode("if", children=[self.__child(p, index) for index in [3, 5, 7][:2 if len(p) == 6 else 3]]))
     
     def p_while_loop(self, p):
         """
-        while_loop : WHILE '(' expression ')' '{' block_body_nonempty '}'
+        while_loop : WHILE '(' expression ')' scoped_block_body
         """
+        self.__node(p, AJSNode("while", children=[self.__child(p, 3), self.__child(p, 5)]))
+    
+    def p_scoped_block_body(self, p):
+        """
+        scoped_block_body : '{' scope block_body_nonempty '}'
+        """
+        self.__variables.exit()  # block variables end with the block
+        self.__node(p, self.__child(p, 3))
+    
+    def p_scope(self, p):
+        """
+        scope :
+        """
+        self.__variables.enter()  # before the first statement of the block
     
     def p_function(self, p):
         """
         function : FUNCTION function_head '{' block_body RETURN expression ';' '}'
         """
-        if p[6].type != self.__functions[p[2][0]].type:
-            del self.__functions[p[2][0]]
-            raise ValueError(f"[ERROR][SEMANTIC]: Function return type mismatch: {p[6].type} != {self.__functions[p[2][0]].type}")
-        for key in self.__functions[p[2][0]].value:
-            if key in p[2][1]:
-                self.__registers[key] = p[2][1][key]  # restore conflicting global variables
-            else:
-                del self.__registers[key]  # delete local variables
+        function = self.__functions[p[2]]
+        self.__variables.exit()  # arguments & local variables end with the function
+        self.__node(p, AJSNode("function", (p[2], list(function.value)), [self.__child(p, 4), self.__child(p, 6)], function.type))
+        if p[6].type != function.type:
+            del self.__functions[p[2]]
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Function return type mismatch: {p[6].type} != {function.type}")
     
     def p_function_head(self, p):
         """
         function_head : STRING_IMPLICIT '(' argument_list ')' ':' type
         """
-        p[0] = (p[1], p[3][1])  # (name, conflicting global variables)
-        self.__functions[p[1]] = AJSObject(p[6], p[3][0])
+        p[0] = p[1]
+        self.__functions[p[1]] = AJSObject(p[6], p[3])
     
     def p_argument_list(self, p):
         """
         argument_list : argument_list_nonempty
             | empty
         """
-        p[0] = ({},{}) if p[1] is None else (p[1],{})  # (local variables, conflicting global variables)
-        for key in p[0][0]:
-            if key in p[0][1]:
-                p[0][1].update({key: self.__registers[key]})  # save conflicting global variable
-            else:
-                self.__registers[key] = AJSObject(p[0][0][key], None)  # use local variable
+        p[0] = {} if p[1] is None else p[1]
+        self.__variables.enter(function=True)  # arguments are the first slots of the function frame
+        for key in p[0]:
+            self.__variables.declare(key, AJSObject(p[0][key], None))
     
     def p_argument_list_nonempty(self, p):
         """
-        argument_list_nonempty : STRING_IMPLICIT ':' type ',' argument_list_nonempty
+        argument_list_nonempty : argument_list_nonempty ',' STRING_IMPLICIT ':' type
             | STRING_IMPLICIT ':' type
         """
-        p[0] = {p[1]: p[3]}
         if len(p) == 6:
-            p[0].update(p[5])
+            p[0] = p[1]
+            p[0][p[3]] = p[5]
+        else:
+            p[0] = {p[1]: p[3]}
     
     def p_expression(self, p):
         """
@@ -301,26 +383,31 @@ class AJSParser:
         """
         if len(p) == 4:
             p[0] = p[2]
+            self.__node(p, self.__child(p, 2))
         else:
             p[0] = p[1]
+            self.__node(p, self.__child(p, 1))
     
     def p_int(self, p):
         """
         expression : INTEGER
         """
         p[0] = AJSObject("INT", p[1])
+        self.__node(p, AJSNode("const", p[1], type=p[0].type))
     
     def p_float(self, p):
         """
         expression : REAL
         """
         p[0] = AJSObject("FLOAT", p[1])
+        self.__node(p, AJSNode("const", p[1], type=p[0].type))
     
     def p_character(self, p):
         """
         expression : CHAR
         """
         p[0] = AJSObject("CHARACTER", p[1])
+        self.__node(p, AJSNode("const", p[1], type=p[0].type))
     
     def p_boolean(self, p):
         """
@@ -328,21 +415,25 @@ class AJSParser:
             | FL
         """
         p[0] = AJSObject("BOOLEAN", p[1])
+        self.__node(p, AJSNode("const", p[1], type=p[0].type))
     
     def p_null(self, p):
         """
         expression : NULL
         """
         p[0] = AJSObject("NULL", p[1])
+        self.__node(p, AJSNode("const", p[1], type=p[0].type))
     
     def p_string_implicit(self, p):
         """
         expression : STRING_IMPLICIT
         """
-        if p[1] in self.__registers:
-            p[0] = self.__registers[p[1]]
+        address = self.__variables.resolve(p[1])
+        if address is not None:
+            p[0] = self.__variables[address]
+            self.__node(p, AJSNode("name", p[1], type=p[0].type)).address = address
         else:
-            raise ValueError(f"[ERROR][SEMANTIC]: Variable not declared: {p[1]}")
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable not declared: {p[1]}")
     
     def p_plus(self, p):
         """
@@ -350,11 +441,13 @@ class AJSParser:
             | expression PLUS expression
         """
         if len(p) == 3:
-            p[1] = AJSOperator("PLUS", p[1])
-            p[0] = p[1].evaluate([p[2]])
+            p[1] = AJSOperator.instance("PLUS", p[1])
+            p[0] = self.__evaluate(p, p[1], [p[2]])
+            self.__node(p, AJSNode("unary", "PLUS", [self.__child(p, 2)], p[0].type))
         else:
-            p[2] = AJSOperator("PLUS", p[2])
-            p[0] = p[2].evaluate([p[1], p[3]])
+            p[2] = AJSOperator.instance("PLUS", p[2])
+            p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+            self.__node(p, AJSNode("binary", "PLUS", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_minus(self, p):
         """
@@ -362,95 +455,107 @@ class AJSParser:
             | expression MINUS expression
         """
         if len(p) == 3:
-            p[1] = AJSOperator("MINUS", p[1])
-            p[0] = p[1].evaluate([p[2]])
+            p[1] = AJSOperator.instance("MINUS", p[1])
+            p[0] = self.__evaluate(p, p[1], [p[2]])
+            self.__node(p, AJSNode("unary", "MINUS", [self.__child(p, 2)], p[0].type))
         else:
-            p[2] = AJSOperator("MINUS", p[2])
-            p[0] = p[2].evaluate([p[1], p[3]])
+            p[2] = AJSOperator.instance("MINUS", p[2])
+            p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+            self.__node(p, AJSNode("binary", "MINUS", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_not(self, p):
         """
         expression : NOT expression
         """
-        p[1] = AJSOperator("NOT", p[1])
-        p[0] = p[1].evaluate([p[2]])
+        p[1] = AJSOperator.instance("NOT", p[1])
+        p[0] = self.__evaluate(p, p[1], [p[2]])
+        self.__node(p, AJSNode("unary", "NOT", [self.__child(p, 2)], p[0].type))
 
     def p_times(self, p):
         """
         expression : expression TIMES expression
         """
-        p[2] = AJSOperator("TIMES", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("TIMES", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "TIMES", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_divide(self, p):
         """
         expression : expression DIVIDE expression
         """
-        p[2] = AJSOperator("DIVIDE", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("DIVIDE", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "DIVIDE", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_and(self, p):
         """
         expression : expression AND expression
         """
-        p[2] = AJSOperator("AND", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("AND", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "AND", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_or(self, p):
         """
         expression : expression OR expression
         """
-        p[2] = AJSOperator("OR", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("OR", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "OR", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_lt(self, p):
         """
         expression : expression LT expression
         """
-        p[2] = AJSOperator("LT", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("LT", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "LT", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_le(self, p):
         """
         expression : expression LE expression
         """
-        p[2] = AJSOperator("LE", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("LE", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "LE", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_eq(self, p):
         """
         expression : expression EQ expression
         """
-        p[2] = AJSOperator("EQ", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("EQ", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "EQ", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_ge(self, p):
         """
         expression : expression GE expression
         """
-        p[2] = AJSOperator("GE", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("GE", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "GE", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
     
     def p_gt(self, p):
         """
         expression : expression GT expression
         """
-        p[2] = AJSOperator("GT", p[2])
-        p[0] = p[2].evaluate([p[1], p[3]])
+        p[2] = AJSOperator.instance("GT", p[2])
+        p[0] = self.__evaluate(p, p[2], [p[1], p[3]])
+        self.__node(p, AJSNode("binary", "GT", [self.__child(p, 1), self.__child(p, 3)], p[0].type))
 
     def p_function_call(self, p):
         """
         function_call : STRING_IMPLICIT '(' function_call_list ')'
         """
         if p[1] not in self.__functions:
-            raise ValueError(f"[ERROR][SEMANTIC]: Function not declared: {p[1]}")
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Function not declared: {p[1]}")
         if len(p[3]) != len(self.__functions[p[1]].value.keys()):
-            raise ValueError(f"[ERROR][SEMANTIC]: Incorrect number of arguments for function: {p[1]}")
-        for argument in self.__functions[p[1]].value:
-            if p[3][0].type != self.__functions[p[1]].value[argument]:
-                raise ValueError(f"[ERROR][SEMANTIC]: Incorrect argument type for function: {p[3][0].type} is not the correct type for {argument}")
-            del p[3][0]  # remove processed argument
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Incorrect number of arguments for function: {p[1]}")
+        for (argument, type), value in zip(self.__functions[p[1]].value.items(), p[3]):
+            if value.type != type:
+                raise self.__semantic(p, f"[ERROR][SEMANTIC]: Incorrect argument type for function: {value.type} is not the correct type for {argument}")
         p[0] = AJSObject(self.__functions[p[1]].type, None)
+        self.__node(p, AJSNode("call", p[1], self.__child(p, 3).children, p[0].type))
     
     def p_function_call_list(self, p):
         """
@@ -458,42 +563,48 @@ class AJSParser:
             | empty
         """
         p[0] = [] if p[1] is None else p[1]
+        self.__node(p, self.__child(p, 1) or AJSNode("arguments"))
     
     def p_function_call_list_nonempty(self, p):
         """
-        function_call_list_nonempty : expression ',' function_call_list_nonempty
+        function_call_list_nonempty : function_call_list_nonempty ',' expression
             | expression
         """
         if len(p) == 4:
-            p[0] = [p[1]] + p[3]
+            p[0] = p[1]
+            p[0].append(p[3])
+            self.__node(p, self.__child(p, 1)).children.append(self.__child(p, 3))
         else:
             p[0] = [p[1]]
+            self.__node(p, AJSNode("arguments", children=[self.__child(p, 1)]))
     
     def p_object_call(self, p):
         """
         object_call : STRING_IMPLICIT object_attribute_list
         """
-        if p[1] not in self.__registers:
-            raise ValueError(f"[ERROR][SEMANTIC]: Variable not declared: {p[1]}")
+        address = self.__variables.resolve(p[1])
+        if address is None:
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Variable not declared: {p[1]}")
         try:
-            attribute = self.__registers[p[1]]
-            for key in p[2]:
-                if isinstance(attribute.value, dict):
-                    attribute = attribute.value
-                attribute = attribute[key]
+            # field offsets from the type layout, then one slot per offset
+            attribute = self.__variables[address]
+            layout = self.__layouts[attribute.type]
+            offsets, type = layout.path(tuple(p[2]))
+            for offset in offsets:
+                attribute = attribute.value.slots[offset]
             p[0] = attribute
-        except (KeyError, TypeError):
-            raise ValueError(f"[ERROR][SEMANTIC]: Incorrect object structure: {p[1]}")
+            node = self.__node(p, AJSNode("attribute", list(p[2]), [AJSNode("name", p[1])], type))
+            node.layout, node.children[0].address = layout, address
+        except (KeyError, AttributeError):  # unknown fields || object without value
+            raise self.__semantic(p, f"[ERROR][SEMANTIC]: Incorrect object structure: {p[1]}")
     
     def p_object_attribute_list(self, p):
         """
-        object_attribute_list : '[' STRING_EXPLICIT ']' object_attribute_list
-            | '.' STRING_IMPLICIT object_attribute_list
+        object_attribute_list : object_attribute_list '[' STRING_EXPLICIT ']'
+            | object_attribute_list '.' STRING_IMPLICIT
         """
-        if len(p) == 5:
-            p[0] = [p[2]] + p[4]
-        else:
-            p[0] = [p[2]] + p[3]
+        p[0] = p[1]
+        p[0].append(p[3])
     
     def p_object_attribute(self, p):
         """
@@ -508,51 +619,198 @@ class AJSParser:
         """
         pass
     
+    # AST
+    def __node(self, p, node: AJSNode) -> AJSNode:
+        # carried by the grammar symbol, next to the semantic value
+        p.slice[0].node = node
+        if node is not None:
+            node.position = self.__position(p)
+        return node
+
+    def __child(self, p, index: int) -> AJSNode:
+        return getattr(p.slice[index], "node", None)
+
+    def __position(self, p) -> Optional[int]:
+        # offset of the first token of a production: tokens have it, other symbols through their node
+        for symbol in islice(p.slice, 1, None):
+            if symbol.__class__ is LexToken:
+                return symbol.lexpos
+            node = getattr(symbol, "node", None)
+            if node is not None and node.position is not None:
+                return node.position
+        return None
+
     # AUXILAR METHODS
-    def __type_structure(self, object: AJSObject):
-        # length
-        if len(self.__symbols[object.type].value.keys()) != len(object.value.keys()):
-            raise ValueError(f"[ERROR][SEMANTIC]: Incorrect object structure: {object.type}")
+    def __semantic(self, p, message: str) -> AJSSemanticError:
+        # located at the first token of the production being reduced
+        return AJSSemanticError(message, self.__position(p))
+
+    def __evaluate(self, p, operator: AJSOperator, operands: List[AJSObject]) -> AJSObject:
+        try:
+            return operator.evaluate(operands)
+        except AJSSemanticError as e:  # unsupported operands: located at the expression
+            e.offset = self.__position(p)
+            raise
+
+    def __type_structure(self, object: AJSObject, node: AJSNode):
+        # object literal -> slot array of the type layout, nested object literals included
+        layout = self.__layouts[object.type]
+        node.layout = layout
+        try:
+            # keys
+            offsets = layout.shape(tuple(object.value))
+        except KeyError:
+            raise AJSSemanticError(f"[ERROR][SEMANTIC]: Incorrect object structure: {object.type}", node.position)
         # object items
-        for key in object.value:
-            try:
-                # object item type
-                if object.value[key].type == "OBJECT":
-                    object.value[key].type = self.__symbols[object.type].value[key]
-                    self.__type_structure(object.value[key])
-                elif self.__symbols[object.type].value[key] != object.value[key].type:
-                    raise ValueError(f"[ERROR][SEMANTIC]: Incorrect object structure: {object.type}")
-            except KeyError:
-                raise ValueError(f"[ERROR][SEMANTIC]: Incorrect object structure: {object.type}")
+        slots = [None] * len(offsets)
+        for offset, item, child in zip(offsets, object.value.values(), node.children):
+            # object item type
+            if item.type == "OBJECT":
+                if layout.layouts[offset] is None:
+                    raise AJSSemanticError(f"[ERROR][SEMANTIC]: Incorrect object structure: {object.type}", child.position)
+                item.type = layout.types[offset]
+                self.__type_structure(item, child)
+            elif layout.types[offset] != item.type:
+                raise AJSSemanticError(f"[ERROR][SEMANTIC]: Incorrect object structure: {object.type}", child.position)
+            slots[offset] = item
+        object.value = AJSStruct(layout, slots)
 
     # ERROR HANDLING
     def p_error(self, p):
         p_value = None if p is None else p.value
-        raise ValueError(f"[ERROR][PARSER]: Not matching production rule:\n"
-            f"# PROVIDED: {p_value}")
+        raise AJSError(f"[ERROR][PARSER]: Not matching production rule:\n"
+            f"# PROVIDED: {p_value}", END if p is None else p.lexpos)
+
+    def __parsed(self):
+        if self.__cached:
+            raise ValueError(f"INCORRECT PARSER STATE:\n"
+                f"# PROVIDED: outputs of the last parse() read from the result cache\n"
+                f"# EXPECTED: load() || parse() of a source not in the result cache")
+
+    # SESSION
+    def reset(self):
+        # fresh semantic state, compiled grammar and lexer are kept
+        self.__symbols = {}
+        self.__functions = {}
+        self.__variables = AJSSymbolTable()  # scope chain of the variables, frames by (depth, slot)
+        self.__layouts = {}  # type name -> field layout
+        self.ast = None  # of the last parsed file
+        self.__cached = False  # last parse() read its outputs from the result cache: nothing parsed
+        self.lexer.lexer.lineno = 1
+
+    @contextmanager
+    def session(self):
+        self.reset()
+        try:
+            yield self
+        finally:
+            self.reset()
 
     # RUN
-    def parse(self, file_path: str):
-        # open file
+    def load(self, data: Union[str, mmap.mmap, bytes, AJSTokenBuffer, AJSTokenList, List[Tuple[str, Any, int]]]):
+        # lexer, syntax & semantic errors located in the source: line & column
+        self.__cached = False
         try:
-            with open(file_path, 'r', encoding="UTF-8") as file:
-                data = file.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"FILE PATH NOT EXIST:\n"
-                f"# PROVIDED: {file_path}")
-        
-        # parse
-        self.parser.parse(data)
+            if isinstance(data, AJSTokenBuffer):  # already tokenized
+                self.parser.parse(lexer=data.rewind())
+            elif isinstance(data, (list, AJSTokenList)):  # (type, value, position) tokens
+                self.parser.parse(lexer=data if isinstance(data, AJSTokenList) else AJSTokenList(data))
+            elif isinstance(data, str):
+                self.parser.parse(data, lexer=self.lexer.lexer)
+            else:  # memory-mapped source
+                self.parser.parse(data, lexer=self.lexer.source)
+        except ValueError as e:
+            if isinstance(data, (list, AJSTokenList)):  # no source: AJSDocument locates them
+                raise
+            raise self.lexer.located(e, data.data if isinstance(data, AJSTokenBuffer) else data) from None
+
+    def tables(self) -> dict:
+        # symbols, functions & registers found so far
+        self.__parsed()
+        return {"symbols": dict(self.__symbols), "functions": dict(self.__functions), "registers": self.__variables.globals()}
+
+    def outputs(self, tables: dict) -> dict:
+        # .symbol & .register file contents
+        return {
+            "symbol": "\n".join([f"{s}: {tables['symbols'][s]}" for s in tables["symbols"]]) +
+                "\n".join([f"{f}: {tables['functions'][f]}" for f in tables["functions"]]),
+            "register": "\n".join([f"{r}: {tables['registers'][r]}" for r in tables["registers"]])
+        }
+
+    def entries(self) -> Dict[Tuple[str, str], Any]:
+        # top-level definitions: (kind, name) -> value, kind: type || function || variable
+        self.__parsed()
+        entries = {("type", name): (self.__symbols[name], self.__layouts[name]) for name in self.__symbols}
+        entries.update({("function", name): self.__functions[name] for name in self.__functions})
+        entries.update({("variable", name): value for name, value in self.__variables.globals().items()})
+        return entries
+
+    def define(self, entries: Dict[Tuple[str, str], Any]):
+        # top-level definitions of the statements before the ones about to be parsed
+        for (kind, name), value in entries.items():
+            if kind == "type":
+                self.__symbols[name], self.__layouts[name] = value
+            elif kind == "function":
+                self.__functions[name] = value
+            else:
+                self.__variables.declare(name, value)
+
+    def parse(self, file_path: str, output: Optional[str] = None):
+        # open file
+        with open_source(file_path) as data:
+            # unchanged source: cached outputs, the source is not parsed: no tables() || entries() || ast
+            key = self.lexer.cache.key(f"par:{self.lexer.numbers}", data)
+            outputs = self.lexer.cache.get(key)
+            self.__cached = outputs is not None
+            if outputs is None:
+                # parse
+                with self.profiler.phase("parse"):
+                    self.load(data)
+                with self.profiler.phase("render"):
+                    outputs = self.outputs(self.tables())
+                self.lexer.cache.put(key, outputs)
+
+        with self.profiler.phase("output"):
+            # output directory
+            stem = output_stem(file_path, output)
+            
+            # symbols & functions output file
+            with open(stem + ".symbol", 'w', encoding="UTF-8") as file:
+                file.write(outputs["symbol"])
+            
+            # registers output file
+            with open(stem + ".register", 'w', encoding="UTF-8") as file:
+                file.write(outputs["register"])
+
+    def execute(self, file_path: str, output: Optional[str] = None) -> dict:
+        # parse, optimize, compile to bytecode & run: global variables at the end of the program
+        with open_source(file_path) as data:
+            with self.profiler.phase("parse"):
+                self.load(data)
+        optimizer = AJSOptimizer()
+        with self.profiler.phase("optimize"):
+            ast = optimizer.optimize(self.ast)
+        with self.profiler.phase("compile"):
+            program = AJSCompiler().compile(ast)
+        with self.profiler.phase("run"):
+            globals = AJSVM().run(program)
+
+        with self.profiler.phase("render"):
+            registers = self.__variables.globals()
+            globals = {name: globals[name] for name in registers}  # block variables at the top of the file are not global
+            for name in globals:  # objects as {key: value}
+                if registers[name].type in self.__layouts:
+                    globals[name] = self.__layouts[registers[name].type].render(globals[name])
+
+        with self.profiler.phase("output"):
+            # output directory
+            stem = output_stem(file_path, output)
+
+            # global variables output file
+            with open(stem + ".run", 'w', encoding="UTF-8") as file:
+                file.write("\n".join([f"{g}: {globals[g]}" for g in globals]))
 
-        # output directory
-        if not os.path.exists("./output/"):
-            os.makedirs("./output/")
-        
-        # symbols & functions output file
-        with open("./output/" + os.path.splitext(os.path.basename(file_path))[0] + ".symbol", 'w', encoding="UTF-8") as file:
-            file.write("\n".join([f"{s}: {self.__symbols[s]}" for s in self.__symbols]))
-            file.write("\n".join([f"{f}: {self.__functions[f]}" for f in self.__functions]))
-        
-        # registers output file
-        with open("./output/" + os.path.splitext(os.path.basename(file_path))[0] + ".register", 'w', encoding="UTF-8") as file:
-            file.write("\n".join([f"{r}: {self.__registers[r]}" for r in self.__registers]))
\ No newline at end of file
+            # optimization report output file
+            with open(stem + ".optimization", 'w', encoding="UTF-8") as file:
+                file.write("\n".join(optimizer.report))
+        return globals
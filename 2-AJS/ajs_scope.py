@@ -0,0 +1,54 @@
+from typing import Any, Dict, Optional, Tuple
+
+
+class AJSScope:
+    __slots__ = ("parent", "depth", "frame", "names")
+
+    def __init__(self, parent: "AJSScope" = None, function: bool = False):
+        # the file & every function get a new frame, blocks store their variables in the frame of the enclosing one
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + function
+        self.frame = [] if parent is None or function else parent.frame
+        self.names = {}  # name -> slot, variables declared in this scope
+
+
+class AJSSymbolTable:
+    def __init__(self):
+        self.scope = self.file = AJSScope()
+        self.frames = [self.file.frame]  # by depth: frames of the file & of the function being parsed
+
+    # SCOPES
+    def enter(self, function: bool = False):
+        self.scope = AJSScope(self.scope, function)
+        if function:
+            self.frames.append(self.scope.frame)
+
+    def exit(self):
+        if self.scope.depth != self.scope.parent.depth:
+            self.frames.pop()
+        self.scope = self.scope.parent
+
+    # VARIABLES
+    def declare(self, name: str, value: Any) -> Tuple[int, int]:
+        self.scope.names[name] = len(self.scope.frame)
+        self.scope.frame.append(value)
+        return (self.scope.depth, self.scope.names[name])
+
+    def resolve(self, name: str) -> Optional[Tuple[int, int]]:
+        # (depth, slot) of the closest declaration, None if not declared
+        scope = self.scope
+        while scope is not None:
+            if name in scope.names:
+                return (scope.depth, scope.names[name])
+            scope = scope.parent
+        return None
+
+    def __getitem__(self, address: Tuple[int, int]) -> Any:
+        return self.frames[address[0]][address[1]]
+
+    def __setitem__(self, address: Tuple[int, int], value: Any):
+        self.frames[address[0]][address[1]] = value
+
+    def globals(self) -> Dict[str, Any]:
+        # variables declared at the top of the file, in declaration order
+        return {name: self.file.frame[slot] for name, slot in self.file.names.items()}
@@ -0,0 +1,111 @@
+import os
+import json
+import stat
+import socket
+import signal
+import asyncio
+from contextlib import suppress
+from typing import Any
+from ajs_parser import AJSParser
+from ajs_source import open_source
+
+
+class AJSServer:
+    def __init__(self, socket_path: str):
+        # lexer & parser tables are built once, every request reuses them
+        self.socket_path = socket_path
+        self.parser = AJSParser()
+        self.lexer = self.parser.lexer
+
+    # REQUESTS
+    # one JSON object per line: {"mode": "lex" || "par", "path": <file path>} || {"mode": ..., "source": <AJS code>}
+    def lex(self, data: Any) -> dict:
+        buffer = self.lexer.buffer(data)
+        return {"tokens": [[type, value, buffer.lines[index]] for index, (type, value) in enumerate(buffer)]}
+
+    def par(self, data: Any) -> dict:
+        with self.parser.session():
+            self.parser.load(data)
+            return {name: {key: str(value) for key, value in table.items()} for name, table in self.parser.tables().items()}
+
+    def handle(self, request: dict) -> dict:
+        try:
+            # ERROR HANDLING
+            if not isinstance(request, dict) or request.get("mode") not in ["lex", "par"]:
+                raise ValueError(f"INCORRECT MODE:\n"
+                    f"# PROVIDED: {request.get('mode') if isinstance(request, dict) else request}\n"
+                    f"# EXPECTED: lex || par")
+            if "source" in request:
+                return {"ok": True, **getattr(self, request["mode"])(request["source"])}
+            with open_source(request.get("path", "")) as data:
+                return {"ok": True, **getattr(self, request["mode"])(data)}
+        except Exception as e:  # diagnostics go back to the client, the server keeps running
+            return {"ok": False, "error": str(e), "type": type(e).__name__}
+
+    # RUN
+    async def connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    response = self.handle(json.loads(line))
+                except json.JSONDecodeError as e:
+                    response = {"ok": False, "error": f"INCORRECT REQUEST:\n# PROVIDED: {line[:80]!r}\n# EXPECTED: JSON", "type": type(e).__name__}
+                writer.write(json.dumps(response, default=str).encode("UTF-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def run(self):
+        if os.path.lexists(self.socket_path):
+            self.__unlink_stale()
+        server = await asyncio.start_unix_server(self.connection, path=self.socket_path)
+        stop = asyncio.get_running_loop().create_future()
+        for signum in [signal.SIGINT, signal.SIGTERM]:
+            asyncio.get_running_loop().add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+        try:
+            async with server:
+                await stop
+        finally:
+            with suppress(FileNotFoundError):  # already removed by another process
+                os.remove(self.socket_path)
+
+    def serve(self):
+        asyncio.run(self.run())
+
+    # ERROR HANDLING
+    def __unlink_stale(self):
+        # only the socket of a stopped server is removed: nothing listens on it
+        if not stat.S_ISSOCK(os.lstat(self.socket_path).st_mode):
+            raise ValueError(f"[ERROR][SERVER]: Socket path is not a socket:\n"
+                f"# PROVIDED: {self.socket_path}")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socket_path)
+            except ConnectionRefusedError:  # stale socket
+                os.remove(self.socket_path)
+                return
+        raise ValueError(f"[ERROR][SERVER]: Socket already in use by a running server:\n"
+            f"# PROVIDED: {self.socket_path}")
+
+
+class AJSClient:
+    def __init__(self, socket_path: str):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+        self.file = self.socket.makefile('rwb')
+
+    def request(self, mode: str, path: str = None, source: str = None) -> dict:
+        request = {"mode": mode, **({"path": os.path.abspath(path)} if source is None else {"source": source})}
+        self.file.write(json.dumps(request).encode("UTF-8") + b"\n")
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self) -> "AJSClient":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
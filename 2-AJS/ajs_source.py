@@ -0,0 +1,112 @@
+import mmap
+import re
+from contextlib import contextmanager
+from typing import Any, Iterator, Union
+from ply.lex import LexToken
+from ajs_errors import AJSError
+
+# last bytes of tokens that \w / \d could extend over a non-ASCII character
+WORD = frozenset(b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+
+
+@contextmanager
+def open_source(file_path: str) -> Iterator[Union[mmap.mmap, bytes, str]]:
+    # read-only memory map of the file, nothing is read up front
+    try:
+        file = open(file_path, 'rb')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"FILE PATH NOT EXIST:\n"
+            f"# PROVIDED: {file_path}")
+
+    with file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            data = b""
+        try:
+            if data.find(b"\r") != -1:  # text mode reads carriage returns as "\n": decode it all
+                yield bytes(data).decode("UTF-8").replace("\r\n", "\n").replace("\r", "\n")
+            else:
+                yield data
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+class AJSSourceLexer:
+    def __init__(self, lexer: Any):
+        # the PLY master regex of `lexer` compiled for bytes, matched in place over the source buffer
+        tables = lexer.lexer
+        patterns = [regex.pattern for regex, _ in tables.lexre] + [f"(?P<literal>[{re.escape(tables.lexliterals)}])"]
+        self.__master = re.compile(f"[{re.escape(tables.lexignore)}]*(?:{'|'.join(patterns)})".encode("UTF-8"),
+            tables.lexreflags & ~re.UNICODE)
+        self.__actions = [None] * (self.__master.groups + 1)  # (rule function or None, token type) by group
+        for regex, rules in tables.lexre:
+            for name, index in regex.groupindex.items():
+                self.__actions[self.__master.groupindex[name]] = rules[index]
+        self.__actions[self.__master.groupindex["literal"]] = (None, None)
+        self.__text = tables  # str lexer, for the few tokens next to non-ASCII characters
+        self.input(b"")
+
+    # PLY LEXER INTERFACE
+    def input(self, data: Union[mmap.mmap, bytes]):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lineno = 1
+
+    def token(self) -> LexToken:
+        data = self.lexdata
+        match = self.__master.match
+        while self.lexpos < len(data):
+            pos = self.lexpos
+            found = match(data, pos)
+            end = pos if found is None else found.end()
+            if found is None or (end < len(data) and data[end] >= 0x80 and data[end - 1] in WORD):
+                # \w and \d go on over non-ASCII characters in text mode, and only text mode reports them
+                t = self.__decoded(pos, end)
+                if t is None:
+                    continue
+                return t
+            index = found.lastindex
+            self.lexpos = end
+            rule, type = self.__actions[index]
+            t = LexToken()
+            t.value = value = found.group(index).decode("UTF-8")
+            t.type = type or value
+            t.lineno = self.lineno
+            t.lexpos = found.start(index)
+            t.lexer = self
+            if rule is None:  # string rule or literal
+                return t
+            t = rule(t)
+            if t is not None:  # rules may drop the token
+                return t
+        return None
+
+    def __iter__(self) -> Iterator[LexToken]:
+        return self
+
+    def __next__(self) -> LexToken:
+        t = self.token()
+        if t is None:
+            raise StopIteration
+        return t
+
+    # AUXILAR METHODS
+    def __decoded(self, pos: int, end: int) -> LexToken:
+        # next token from the decoded rest of the line: tokens never go on over a line break
+        line_end = self.lexdata.find(b"\n", end)
+        text = self.lexdata[pos:len(self.lexdata) if line_end == -1 else line_end + 1].decode("UTF-8")
+        self.__text.input(text)
+        self.__text.lineno = self.lineno
+        try:
+            t = self.__text.token()
+        except AJSError as e:  # offset of the error in the source, not in the decoded line
+            e.offset = pos + len(text[:e.offset].encode("UTF-8"))
+            raise
+        self.lineno = self.__text.lineno
+        self.lexpos = pos + len(text[:self.__text.lexpos].encode("UTF-8"))
+        if t is not None:
+            t.lexpos = pos + len(text[:t.lexpos].encode("UTF-8"))
+            t.lexer = self
+        return t
@@ -0,0 +1,80 @@
+import os
+import glob
+import hashlib
+import importlib.util
+from importlib.machinery import SourcelessFileLoader
+from typing import Any, Callable
+import ply
+from ply.lex import lex
+from ply.yacc import yacc
+
+# bump to invalidate every cached table module
+TABLES_VERSION = 1
+
+CACHE_DIR = os.environ.get("AJS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "__plycache__"))
+
+
+def signature(module: Any, prefix: str) -> str:
+    # everything PLY reads to build the tables: rule docstrings / @TOKEN patterns / patterns and grammar settings
+    items = [TABLES_VERSION, ply.__version__]
+    for name in ["tokens", "literals", "reserved", "precedence", "start"]:
+        items.append((name, getattr(module, name, None)))
+    for name in sorted(dir(module)):
+        if name.startswith(prefix):
+            rule = getattr(module, name)
+            items.append((name, getattr(rule, "regex", rule.__doc__) if callable(rule) else rule))
+    return hashlib.sha256(repr(items).encode("UTF-8")).hexdigest()[:16]
+
+
+def build_lexer(module: Any, cache_dir: str = CACHE_DIR):
+    return _cached(f"ajslextab_{signature(module, 't_')}", cache_dir,
+        lambda lextab, outputdir: lex(module=module, optimize=True, lextab=lextab, outputdir=outputdir))
+
+
+def build_parser(module: Any, cache_dir: str = CACHE_DIR):
+    return _cached(f"ajsparsetab_{signature(module, 'p_')}", cache_dir,
+        lambda tabmodule, outputdir: yacc(module=module, tabmodule=tabmodule, outputdir=outputdir, debug=False))
+
+
+def _cached(name: str, cache_dir: str, build: Callable[[Any, str], Any]):
+    path = os.path.join(cache_dir, name + ".py")
+
+    # warm start: load the compiled table module straight from the cache directory
+    if os.path.exists(path + "c"):
+        try:
+            spec = importlib.util.spec_from_loader(name, SourcelessFileLoader(name, path + "c"))
+            table = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(table)
+        except (ImportError, EOFError, ValueError, TypeError):  # bad magic number || truncated || corrupt bytecode: rebuild it
+            table = None
+        if table is not None:
+            return build(table, cache_dir)
+
+    # cold start: generate the tables aside and publish them atomically
+    import shutil, tempfile, py_compile  # only needed here, kept off the warm start path
+    os.makedirs(cache_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        result = build(name, build_dir)
+        if os.path.exists(os.path.join(build_dir, name + ".py")):
+            # bytecode is written explicitly, independently of PYTHONDONTWRITEBYTECODE
+            py_compile.compile(os.path.join(build_dir, name + ".py"), cfile=os.path.join(build_dir, name + ".pyc"), doraise=True)
+            os.replace(os.path.join(build_dir, name + ".py"), path)
+            os.replace(os.path.join(build_dir, name + ".pyc"), path + "c")
+            _prune(name, cache_dir)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return result
+
+
+def _prune(name: str, cache_dir: str):
+    # tables of older grammars with the same prefix are never loaded again
+    prefix = name.rsplit("_", 1)[0] + "_"
+    for stale in glob.glob(os.path.join(glob.escape(cache_dir), prefix + "*.py*")) + \
+            glob.glob(os.path.join(glob.escape(cache_dir), "__pycache__", prefix + "*.pyc")):
+        if not os.path.basename(stale).startswith(name + "."):
+            try:
+                os.remove(stale)
+            except OSError:  # removed by a concurrent build
+                pass
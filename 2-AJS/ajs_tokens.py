@@ -0,0 +1,97 @@
+import mmap
+from array import array
+from typing import Any, Iterator, List, Tuple, Union
+from ply.lex import LexToken
+
+
+class AJSTokenBuffer:
+    def __init__(self, lexer: Any, data: Union[str, mmap.mmap, bytes]):
+        # one array column per token field, token values are decoded from `data` on demand
+        self.data = data
+        self.types = list(lexer.literals) + list(lexer.tokens)  # kind id -> token type
+        self.kinds = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.lines = array('I')
+        self.__reserved = lexer.reserved
+        self.__rules = {type: getattr(lexer, f"t_{type}") for type in lexer.tokens if callable(getattr(lexer, f"t_{type}", None))}
+        self.__lines = lexer.lines  # line index shared with the lexer
+
+        # fill
+        kind = {type: index for index, type in enumerate(self.types)}
+        tokenizer = lexer.lexer if isinstance(data, str) else lexer.source  # or memory-mapped source
+        tokenizer.lineno = 1
+        tokenizer.input(data)
+        for t in tokenizer:
+            self.kinds.append(kind[t.type])
+            self.starts.append(t.lexpos)
+            self.ends.append(tokenizer.lexpos)
+            self.lines.append(t.lineno)
+        self.rewind()
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> Tuple[str, Any]:
+        return (self.types[self.kinds[index]], self.value(index))
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return (self[index] for index in range(len(self)))
+
+    # PLY LEXER INTERFACE
+    def rewind(self) -> "AJSTokenBuffer":
+        self.position = 0
+        return self
+
+    def token(self) -> LexToken:
+        if self.position == len(self):
+            return None
+        t = self.__token(self.position)
+        t.value = self.value(self.position)
+        self.position += 1
+        return t
+
+    # DECODING
+    def text(self, index: int) -> str:
+        text = self.data[self.starts[index]:self.ends[index]]
+        return text if isinstance(text, str) else text.decode("UTF-8")
+
+    def value(self, index: int) -> Any:
+        type = self.types[self.kinds[index]]
+        if type in self.__reserved:
+            return self.__reserved[type]
+        if type in self.__rules:  # same conversion as the lexer rule
+            return self.__rules[type](self.__token(index)).value
+        return self.text(index)
+
+    def location(self, index: int) -> Tuple[int, int]:
+        # (line, column) of a token: `position` is the parser's cursor
+        return self.__lines(self.data).position(self.starts[index])
+
+    # AUXILAR METHODS
+    def __token(self, index: int) -> LexToken:
+        t = LexToken()
+        t.type = self.types[self.kinds[index]]
+        t.value = self.text(index)
+        t.lineno = self.lines[index]
+        t.lexpos = self.starts[index]
+        t.lexer = self
+        return t
+
+
+class AJSTokenList:
+    def __init__(self, tokens: List[Tuple[str, Any, int]]):
+        # PLY lexer interface over (type, value, position) tokens lexed before
+        self.__tokens = iter(tokens)
+        self.ended = False  # the parser read past the last token: reductions waiting for the next one
+
+    def token(self) -> LexToken:
+        for type, value, position in self.__tokens:
+            if type == "error":  # lexer error of an illegal character
+                raise value
+            t = LexToken()
+            t.type, t.value, t.lineno, t.lexpos = type, value, 0, position
+            t.lexer = self
+            return t
+        self.ended = True
+        return None
@@ -0,0 +1,118 @@
+from typing import Any, Dict
+from ajs_compiler import AJSProgram, LOAD_CONST, LOAD_GLOBAL, STORE_GLOBAL, LOAD_LOCAL, STORE_LOCAL, DUP, POP, \
+    JUMP, JUMP_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, CALL, RETURN, HALT, \
+    ADD, SUB, MUL, DIV, LT, LE, EQ, GE, GT, NEG, NOT, TO_FLOAT, BUILD_OBJECT, GET_ATTRIBUTE, SET_ATTRIBUTE
+
+# nested calls before a runtime error, the VM keeps its own frames
+MAX_DEPTH = 100000
+
+
+class AJSVM:
+    def __init__(self, max_depth: int = MAX_DEPTH):
+        self.max_depth = max_depth
+
+    # RUN
+    def run(self, program: AJSProgram) -> Dict[str, Any]:
+        try:
+            globals = self.__run(program)
+        except ZeroDivisionError:
+            raise ValueError("[ERROR][RUNTIME]: Division by zero")
+        except (TypeError, AttributeError) as e:  # null values & objects without value
+            raise ValueError(f"[ERROR][RUNTIME]: Operation not supported:\n"
+                f"# PROVIDED: {e}")
+        return dict(zip(program.names, globals))
+
+    def __run(self, program: AJSProgram) -> list:
+        # one dispatch loop, most frequent opcodes first
+        constants, functions = program.constants, program.functions
+        globals = [None] * len(program.names)
+        code, pc, locals = program.main.code, 0, []
+        stack, frames = [], []
+        push, pop = stack.append, stack.pop
+        while True:
+            op, arg = code[pc], code[pc + 1]
+            pc += 2
+            if op == LOAD_LOCAL:
+                push(locals[arg])
+            elif op == LOAD_CONST:
+                push(constants[arg])
+            elif op == STORE_LOCAL:
+                locals[arg] = pop()
+            elif op == LOAD_GLOBAL:
+                push(globals[arg])
+            elif op == STORE_GLOBAL:
+                globals[arg] = pop()
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == ADD:
+                right = pop()
+                stack[-1] += right
+            elif op == SUB:
+                right = pop()
+                stack[-1] -= right
+            elif op == LT:
+                right = pop()
+                stack[-1] = stack[-1] < right
+            elif op == GE:
+                right = pop()
+                stack[-1] = stack[-1] >= right
+            elif op == CALL:
+                function = functions[arg]
+                if len(frames) >= self.max_depth:
+                    raise ValueError(f"[ERROR][RUNTIME]: Maximum call depth exceeded: {function.name}")
+                frames.append((code, pc, locals))
+                locals = stack[len(stack) - function.arguments:] + [None] * (function.locals - function.arguments)
+                del stack[len(stack) - function.arguments:]
+                code, pc = function.code, 0
+            elif op == RETURN:
+                code, pc, locals = frames.pop()
+            elif op == MUL:
+                right = pop()
+                stack[-1] *= right
+            elif op == DIV:
+                right = pop()
+                stack[-1] /= right
+            elif op == LE:
+                right = pop()
+                stack[-1] = stack[-1] <= right
+            elif op == GT:
+                right = pop()
+                stack[-1] = stack[-1] > right
+            elif op == EQ:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == TO_FLOAT:
+                stack[-1] = float(stack[-1])
+            elif op == NEG:
+                stack[-1] = -stack[-1]
+            elif op == NOT:
+                stack[-1] = not stack[-1]
+            elif op == JUMP_IF_FALSE_OR_POP:
+                if not stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif op == JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif op == POP:
+                pop()
+            elif op == DUP:
+                push(stack[-1])
+            elif op == BUILD_OBJECT:
+                positions = constants[arg]
+                values = stack[len(stack) - len(positions):]
+                del stack[len(stack) - len(positions):]
+                push([values[position] for position in positions])
+            elif op == GET_ATTRIBUTE:
+                stack[-1] = stack[-1][arg]
+            elif op == SET_ATTRIBUTE:
+                value = pop()
+                pop()[arg] = value
+            elif op == HALT:
+                return globals
@@ -0,0 +1,899 @@
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+
+
+def startup(runs: str = "10"):
+    # cold: empty table cache on every run || warm: tables generated by a previous run
+    script = "from ajs_parser import AJSParser; AJSParser()"
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    def run(cache_dir: str) -> float:
+        env = dict(os.environ, AJS_CACHE_DIR=cache_dir)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], cwd=directory, env=env, check=True)
+        return time.perf_counter() - start
+
+    cold = []
+    for _ in range(int(runs)):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(run(cache_dir))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        run(cache_dir)
+        warm = [run(cache_dir) for _ in range(int(runs))]
+
+    print(f"cold start: {statistics.median(cold) * 1000:.1f} ms (median of {runs})")
+    print(f"warm start: {statistics.median(warm) * 1000:.1f} ms (median of {runs})")
+    print(f"speedup: {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+
+def _nested(n: int) -> str:
+    # n nested types and an object call n attributes deep
+    types = "".join(f"type T{i} = {{x: T{i - 1}}};" if i else "type T0 = {x: int};" for i in range(n))
+    return f"{types} let o: T{n - 1}; o = {'{x: ' * n}1{'}' * n}; o{'.x' * n};"
+
+
+PRODUCTIONS = {
+    "declaration_content": lambda n: "let " + ", ".join(f"v{i}" for i in range(n)) + ";",
+    "definition_object_content": lambda n: "type T = {" + ", ".join(f"f{i}: int" for i in range(n)) + "};",
+    "object_content": lambda n: "type T = {" + ", ".join(f"f{i}: int" for i in range(n)) + "}; let o: T; "
+        "o = {" + ", ".join(f"f{i}: {i}" for i in range(n)) + "};",
+    "argument_list_nonempty": lambda n: "function f(" + ", ".join(f"a{i}: int" for i in range(n)) + "): int {return 0;}",
+    "function_call_list_nonempty": lambda n: "function f(" + ", ".join(f"a{i}: int" for i in range(n)) + "): int {return 0;} "
+        "f(" + ", ".join("0" for _ in range(n)) + ");",
+    "object_attribute_list": _nested,
+    "file": lambda n: "let v; " + "v = 1; " * n
+}
+
+
+def productions(sizes: str = "1000,10000,50000", names: str = ",".join(PRODUCTIONS)):
+    # parse time per list element must stay flat as the list grows
+    from ajs_parser import AJSParser
+    parser = AJSParser()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * max(map(int, sizes.split(",")))))  # nested object checks
+    for name in names.split(","):
+        for size in map(int, sizes.split(",")):
+            data = PRODUCTIONS[name](size)
+            with parser.session():
+                start = time.perf_counter()
+                parser.parser.parse(data, lexer=parser.lexer.lexer)
+                elapsed = time.perf_counter() - start
+            print(f"{name:<28} {size:>8} elements: {elapsed * 1000:10.1f} ms ({elapsed / size * 1e6:.2f} us/element)")
+
+
+def tokens(size: str = "20000"):
+    # memory held per token: list of LexToken objects vs compact token buffer
+    import tracemalloc
+    from ajs_lexer import AJSLexer
+    lexer = AJSLexer()
+    data = "".join(f"let v{i}: float; v{i} = {i} + 0x{i:x} * {i}.5e2; if (v{i} <= 'a' && tr) {{ v{i} = \"s{i}\"; }}\n"
+        for i in range(int(size)))
+
+    def token_list():
+        lexer.lexer.lineno = 1
+        lexer.lexer.input(data)
+        return list(lexer.lexer)
+
+    results = {}
+    for name, build in [("LexToken list", token_list), ("token buffer", lambda: lexer.buffer(data))]:
+        tracemalloc.start()
+        result = build()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = [(t.type, t.value) for t in result] if name == "LexToken list" else list(result)
+        print(f"{name:<14} {len(result):>8} tokens: {current / len(result):8.1f} bytes/token held, peak {peak / 2 ** 20:8.1f} MiB")
+        del result
+    if results["LexToken list"] != results["token buffer"]:
+        raise ValueError("[ERROR][BENCHMARK]: Different token values in the token buffer")
+
+
+def source(size: str = "20000"):
+    # read() into a str vs memory-mapped file: load + lex time and peak memory
+    import tracemalloc
+    from collections import deque
+    from ajs_lexer import AJSLexer
+    from ajs_source import open_source
+    lexer = AJSLexer()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "source.ajs")
+        with open(path, 'w', encoding="UTF-8") as file:
+            file.writelines(f"let v{i}: float; v{i} = {i} + 0x{i:x} * {i}.5e2; /* v{i} */ if (v{i} <= 'a') {{ v{i} = \"s{i}\"; }}\n"
+                for i in range(int(size)))
+
+        def text():
+            with open(path, 'r', encoding="UTF-8") as file:
+                lexer.lexer.lineno = 1
+                lexer.lexer.input(file.read())
+                deque(lexer.lexer, maxlen=0)
+
+        def mapped():
+            with open_source(path) as data:
+                lexer.source.input(data)
+                deque(lexer.source, maxlen=0)
+
+        for name, run in [("read", text), ("mmap", mapped)]:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()  # separate run: tracing slows everything down
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:<4} {os.path.getsize(path) / 2 ** 20:6.1f} MiB file: {elapsed * 1000:10.1f} ms, peak memory {peak / 2 ** 20:8.1f} MiB")
+
+
+def comments(size: str = "10"):
+    # comment-heavy input of <size> MiB: tempered block comment regex vs linear search of the closing
+    from collections import deque
+    from ajs_lexer import AJSLexer
+    from ajs_source import open_source
+
+    class Tempered(AJSLexer):  # block comment rule before the linear search
+        def t_comment(self, t):
+            r'(\/\/.*)|(\/\*(?:(?!\*\/).|\n)*\*\/)'
+            pass
+
+    license = "/*\n" + "".join(f" * Licensed under the terms of clause {i}: provided \"as is\", without warranty of any kind.\n"
+        for i in range(40)) + " */\n"
+    chunk = license + "".join(f"// v{i}: documented below\nlet v{i} = {i} / 2 * 3; /** v{i} **/\n" for i in range(20))
+    inputs = {"terminated": chunk * (int(size) * 2 ** 20 // len(chunk) + 1),
+        "unterminated": "let v = 1;\n/*\n" + license[3:-4] * (int(size) * 2 ** 20 // len(license) + 1)}
+    lexers = {"tempered": Tempered(), "linear": AJSLexer()}
+
+    def lex(lexer, data):
+        lexer.lineno = 1
+        lexer.input(data)
+        try:
+            return [(t.type, t.value) for t in lexer]
+        except ValueError as e:
+            return [str(e)]
+
+    for case, data in inputs.items():
+        results = {}
+        for name, lexer in lexers.items():
+            start = time.perf_counter()
+            results[name] = lex(lexer.lexer, data)
+            elapsed = time.perf_counter() - start
+            print(f"{case:<12} {name:<8} {len(data) / 2 ** 20:6.1f} MiB: {elapsed * 1000:10.1f} ms ({len(results[name])} tokens || errors)")
+        if case == "terminated" and results["tempered"] != results["linear"]:
+            raise ValueError("[ERROR][BENCHMARK]: Different token streams")
+
+    with tempfile.TemporaryDirectory() as directory:  # memory-mapped source lexer, same rule over bytes
+        path = os.path.join(directory, "comments.ajs")
+        with open(path, 'w', encoding="UTF-8") as file:
+            file.write(inputs["terminated"])
+        start = time.perf_counter()
+        with open_source(path) as data:
+            lexers["linear"].source.input(data)
+            deque(lexers["linear"].source, maxlen=0)
+        print(f"{'terminated':<12} {'mmap':<8} {os.path.getsize(path) / 2 ** 20:6.1f} MiB: {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+
+def positions(size: str = "20000", queries: str = "2000"):
+    # line & column of token offsets: scanning back through the source vs line-start index & binary search
+    import random
+    from ajs_lexer import AJSLexer
+    lexer = AJSLexer()
+    data = "".join(f"let v{i}: int;\nv{i} = {i} * 2; /* v{i}\n */ // line {i}\n" for i in range(int(size)))
+    lexer.lexer.lineno = 1
+    lexer.lexer.input(data)
+    tokens = [(t.lexpos, t.lineno) for t in lexer.lexer]
+    offsets = [offset for offset, _ in random.Random(0).choices(tokens, k=int(queries))]
+
+    start = time.perf_counter()
+    scanned = [(data.count("\n", 0, offset) + 1, offset - data.rfind("\n", 0, offset)) for offset in offsets]
+    scanning = time.perf_counter() - start
+    start = time.perf_counter()
+    lines = lexer.lines(data)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [lines.position(offset) for offset in offsets]
+    searching = time.perf_counter() - start
+
+    if scanned != indexed or any(lineno != lines.line(offset) for offset, lineno in tokens):
+        raise ValueError("[ERROR][BENCHMARK]: Different token positions")
+    print(f"scan back    {len(offsets):>8} positions: {scanning * 1000:10.1f} ms ({scanning / len(offsets) * 1e6:.2f} us/position)")
+    print(f"line index   {len(lines):>8} lines:     {built * 1000:10.1f} ms to build, {searching * 1000:.1f} ms "
+        f"({searching / len(offsets) * 1e6:.2f} us/position)")
+
+
+def serve(runs: str = "20", path: str = "tests/semantic/test_ok_statement.ajs"):
+    # one-shot main.py process vs request to a running server, for the same file
+    from ajs_server import AJSClient
+    directory = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.abspath(os.path.join(directory, path))
+    with tempfile.TemporaryDirectory() as work_dir:  # main.py writes ./output/
+        cold = []
+        for _ in range(int(runs)):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(directory, "main.py"), path, "-par"], cwd=work_dir, check=True)
+            cold.append(time.perf_counter() - start)
+
+        socket_path = os.path.join(work_dir, "ajs.sock")
+        server = subprocess.Popen([sys.executable, os.path.join(directory, "main.py"), "--serve", socket_path])
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.01)
+            with AJSClient(socket_path) as client:
+                response = client.request("par", path)
+                if not response["ok"]:
+                    raise ValueError(f"[ERROR][BENCHMARK]: Server request failed:\n"
+                        f"# PROVIDED: {response['error']}")
+                warm = []
+                for _ in range(int(runs)):
+                    start = time.perf_counter()
+                    client.request("par", path)
+                    warm.append(time.perf_counter() - start)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"one-shot process: {statistics.median(cold) * 1000:8.2f} ms (median of {runs})")
+    print(f"server request:   {statistics.median(warm) * 1000:8.2f} ms (median of {runs})")
+    print(f"speedup: {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+
+def watch(files: str = "200", runs: str = "10", path: str = "tests/semantic/test_ok_statement.ajs"):
+    # one-shot main.py process vs a running --watch process, from saving one file of a tree to its result
+    import random
+    random.seed(0)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(directory, path), encoding="UTF-8") as file:
+        source = file.read()
+    with tempfile.TemporaryDirectory() as work_dir:  # main.py writes ./output/
+        tree = os.path.join(work_dir, "tree")
+        os.makedirs(tree)
+        for i in range(int(files)):
+            with open(os.path.join(tree, f"file_{i}.ajs"), 'w', encoding="UTF-8") as file:
+                file.write(source + f"\n// {i}\n")
+        edited = os.path.join(tree, "file_0.ajs")
+
+        cold = []
+        for i in range(int(runs)):
+            with open(edited, 'a', encoding="UTF-8") as file:
+                file.write(f"// cold {i}\n")
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(directory, "main.py"), edited, "-par"], cwd=work_dir, check=True)
+            cold.append(time.perf_counter() - start)
+
+        watcher = subprocess.Popen([sys.executable, "-u", os.path.join(directory, "main.py"), tree, "-par", "--watch"],
+            cwd=work_dir, stdout=subprocess.PIPE, text=True)
+        try:
+            start = time.perf_counter()
+            for _ in range(int(files)):  # first run of every file
+                watcher.stdout.readline()
+            first = time.perf_counter() - start
+            warm = []
+            for i in range(int(runs)):
+                time.sleep(random.random() * 0.1)  # saved at any point of the polling interval
+                with open(edited, 'a', encoding="UTF-8") as file:
+                    file.write(f"// warm {i}\n")
+                start = time.perf_counter()
+                line = watcher.stdout.readline()
+                warm.append(time.perf_counter() - start)
+                if not line.startswith(f">>> AJS FILE {edited}"):
+                    raise ValueError(f"[ERROR][BENCHMARK]: Unexpected watch output:\n"
+                        f"# PROVIDED: {line.strip()}\n"
+                        f"# EXPECTED: >>> AJS FILE {edited}")
+        finally:
+            watcher.terminate()
+            watcher.wait()
+
+    print(f"watch, first run of {files} files: {first * 1000:8.1f} ms")
+    print(f"one-shot process:   {statistics.median(cold) * 1000:8.2f} ms (median of {runs})")
+    print(f"watch, save to result: {statistics.median(warm) * 1000:8.2f} ms (median of {runs}, polling included)")
+
+
+def batch(files: str = "200", jobs: str = str(os.cpu_count())):
+    # one main.py process per file vs one batch run over the whole directory
+    directory = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as work_dir:  # main.py writes ./output/
+        source_dir = os.path.join(work_dir, "sources")
+        os.makedirs(source_dir)
+        for i in range(int(files)):
+            with open(os.path.join(source_dir, f"file{i}.ajs"), 'w', encoding="UTF-8") as file:
+                file.write("".join(f"let v{j} = {j}; v{j} = v{j} * 2 + {i};\n" for j in range(50)))
+
+        sample = min(int(files), 20)  # per-file processes are slow: time a sample and scale it
+        start = time.perf_counter()
+        for i in range(sample):
+            subprocess.run([sys.executable, os.path.join(directory, "main.py"), os.path.join(source_dir, f"file{i}.ajs"), "-par"],
+                cwd=work_dir, check=True)
+        single = (time.perf_counter() - start) / sample * int(files)
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(directory, "main.py"), source_dir, "-par", "--jobs", jobs],
+            cwd=work_dir, check=True, stdout=subprocess.DEVNULL)
+        together = time.perf_counter() - start
+
+    print(f"process per file: {single:8.2f} s ({files} files, estimated from {sample})")
+    print(f"batch, {jobs:>2} jobs:   {together:8.2f} s")
+    print(f"speedup: {single / together:.1f}x")
+
+
+def cache(size: str = "20000"):
+    # first run (cache miss) vs unchanged source (cache hit), then LRU eviction under a small limit
+    from ajs_parser import AJSParser
+    from ajs_cache import AJSResultCache
+    parser = AJSParser()
+    with tempfile.TemporaryDirectory() as work_dir:  # parse writes ./output/
+        parser.lexer.cache = AJSResultCache(os.path.join(work_dir, "cache"))
+        path = os.path.join(work_dir, "cache.ajs")
+        with open(path, 'w', encoding="UTF-8") as file:
+            file.writelines(f"let v{i} = {i}; v{i} = v{i} * 2 + 1;\n" for i in range(int(size)))
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            for name in ["miss", "hit"]:
+                with parser.session():
+                    start = time.perf_counter()
+                    parser.parse(path)
+                    elapsed = time.perf_counter() - start
+                print(f"{name:<4} {elapsed * 1000:10.1f} ms")
+
+            cache = AJSResultCache(os.path.join(work_dir, "lru"), max_size=4096)
+            for i in range(100):
+                cache.put(cache.key("lex", f"source {i}"), {"token": "x" * 100})
+            kept = os.listdir(cache.cache_dir)
+            print(f"lru  {len(kept)} of 100 entries kept, {sum(os.path.getsize(os.path.join(cache.cache_dir, name)) for name in kept)} bytes "
+                f"(limit {cache.max_size}), newest kept: {cache.get(cache.key('lex', 'source 99')) is not None}")
+        finally:
+            os.chdir(cwd)
+
+
+VM_PROGRAMS = {
+    "fib": lambda n: "function fib(n: int): int { let r = n; if (n >= 2) { r = fib(n - 1) + fib(n - 2); } return r; } "
+        f"let x = fib({n});",
+    "while": lambda n: f"let i = 0; let s = 0; while (i < {n}) {{ let j = 0; while (j < {n}) {{ s = s + i * j; j = j + 1; }} i = i + 1; }}"
+}
+
+
+def _fib(n: int) -> int:
+    return n if n < 2 else _fib(n - 1) + _fib(n - 2)
+
+
+def _while(n: int) -> int:
+    i, s = 0, 0
+    while i < n:
+        j = 0
+        while j < n:
+            s = s + i * j
+            j = j + 1
+        i = i + 1
+    return s
+
+
+def vm(fib_n: str = "22", while_n: str = "300"):
+    # parse + compile once, then the bytecode VM against the same program in plain Python
+    from ajs_parser import AJSParser
+    from ajs_compiler import AJSCompiler
+    from ajs_vm import AJSVM
+    parser = AJSParser()
+    for name, n, reference in [("fib", int(fib_n), _fib), ("while", int(while_n), _while)]:
+        with parser.session():
+            start = time.perf_counter()
+            parser.load(VM_PROGRAMS[name](n))
+            program = AJSCompiler().compile(parser.ast)
+            compiled = time.perf_counter() - start
+        start = time.perf_counter()
+        result = AJSVM().run(program)["x" if name == "fib" else "s"]
+        executed = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = reference(n)
+        native = time.perf_counter() - start
+        if result != expected:
+            raise ValueError(f"[ERROR][BENCHMARK]: Different VM result:\n"
+                f"# PROVIDED: {result}\n"
+                f"# EXPECTED: {expected}")
+        instructions = sum(len(function.code) // 2 for function in [program.main] + program.functions)
+        print(f"{name:<5} n={n:<5} parse + compile {compiled * 1000:8.1f} ms ({instructions} instructions), "
+            f"VM {executed * 1000:8.1f} ms, Python {native * 1000:8.1f} ms ({executed / native:.1f}x)")
+
+
+def _decidable(n: int) -> str:
+    # generated code: constants, statically decidable conditions & loops that never run
+    return "let s = 0; " + "".join(f"let c{i} = {i} * 2 + 1; if (c{i} > {i} && tr) {{ s = s + c{i} * (4 - 2); }} else {{ s = s - 1; }} "
+        f"while (c{i} < 0 || fl) {{ s = 0; }} let d{i} = c{i} - 3 == {i} || !(c{i} >= 0);" for i in range(n))
+
+
+def optimize(size: str = "2000", runs: str = "20"):
+    # bytecode & VM time for the program as parsed vs after constant folding & dead code elimination
+    from ajs_parser import AJSParser
+    from ajs_optimizer import AJSOptimizer
+    from ajs_compiler import AJSCompiler
+    from ajs_vm import AJSVM
+    parser = AJSParser()
+    results = {}
+    for name in ["parsed", "optimized"]:
+        with parser.session():
+            parser.load(_decidable(int(size)))
+            ast = parser.ast
+            start = time.perf_counter()
+            if name == "optimized":
+                optimizer = AJSOptimizer()
+                ast = optimizer.optimize(ast)
+            program = AJSCompiler().compile(ast)
+            compiled = time.perf_counter() - start
+        times = []
+        for _ in range(int(runs)):
+            start = time.perf_counter()
+            results[name] = AJSVM().run(program)
+            times.append(time.perf_counter() - start)
+        instructions = sum(len(function.code) // 2 for function in [program.main] + program.functions)
+        print(f"{name:<9} {instructions:>8} instructions, optimize + compile {compiled * 1000:8.1f} ms, "
+            f"VM {statistics.median(times) * 1000:8.2f} ms (median of {runs})")
+    if results["parsed"] != results["optimized"]:
+        raise ValueError("[ERROR][BENCHMARK]: Different results after optimizing")
+    print(optimizer.report[-1] + f", {sum(line.startswith('REMOVED') for line in optimizer.report)} statements / branches removed, "
+        f"{sum(line.startswith('FOLDED') for line in optimizer.report)} expressions folded, "
+        f"{sum(line.startswith('PROPAGATED') for line in optimizer.report)} constants propagated")
+
+
+class _DictObject:
+    # AJSObject layout before slots: per-instance __dict__, type name strings
+    def __init__(self, type: str, value):
+        if not isinstance(type, str):
+            raise TypeError("INCORRECT TYPE FOR `type`")
+        self.type = type
+        self.value = value
+
+
+def _deep(depth: int, n: int, statements: int) -> str:
+    # nested types `depth` levels deep, assigned whole & read by path in a loop
+    types = "".join(f"type T{i} = {{v: int, x: T{i - 1}}};" if i else "type T0 = {v: int, w: boolean};" for i in range(depth))
+    literal = "".join(f"{{x: " for _ in range(depth - 1)) + "{v: i, w: tr}" + "".join(f", v: {i}}}" for i in range(1, depth))
+    path = ".x" * (depth - 1)
+    body = "".join(f"o = {literal}; s = s + o{path}.v; o{path}.v = s;" for _ in range(statements))
+    return f"{types} let o: T{depth - 1}; let s = 0; let i = 0; while (i < {n}) {{ {body} i = i + 1; }}"
+
+
+def layouts(depth: str = "8", n: str = "2000", statements: str = "50"):
+    # parse (structure checks, attribute paths) & VM time for deeply nested object assignments
+    from ajs_parser import AJSParser
+    from ajs_compiler import AJSCompiler
+    from ajs_vm import AJSVM
+    parser = AJSParser()
+    data = _deep(int(depth), int(n), int(statements))
+    with parser.session():
+        start = time.perf_counter()
+        parser.load(data)
+        parsed = time.perf_counter() - start
+        program = AJSCompiler().compile(parser.ast)
+    start = time.perf_counter()
+    result = AJSVM().run(program)
+    executed = time.perf_counter() - start
+    print(f"depth {depth}, {statements} assignments: parse {parsed * 1000:8.1f} ms, "
+        f"VM {executed * 1000:8.1f} ms for {n} iterations (s = {result['s']})")
+
+
+def _scoped(functions: int, arguments: int) -> str:
+    # functions with many arguments, locals in nested blocks & reads of globals
+    header = ", ".join(f"a{j}: int" for j in range(arguments))
+    reads = " + ".join(f"a{j}" for j in range(0, arguments, 4))
+    return "let g = 1; let h = 2; " + "".join(f"function f{i}({header}): int {{ let s = {reads}; "
+        f"if (s > g) {{ let t = s * h; while (t > a0) {{ let u = t - g; t = u; }} s = t; }} return s + a{arguments - 1}; }}\n"
+        for i in range(functions)) + f"let r = f{functions - 1}({', '.join(['1'] * arguments)});"
+
+
+def scopes(functions: str = "500", arguments: str = "40", runs: str = "5"):
+    # parse time of function & block scopes: entering, declaring, resolving names & leaving
+    from ajs_parser import AJSParser
+    parser = AJSParser()
+    data = _scoped(int(functions), int(arguments))
+    times = []
+    for _ in range(int(runs)):
+        with parser.session():
+            start = time.perf_counter()
+            parser.load(data)
+            times.append(time.perf_counter() - start)
+    elapsed = statistics.median(times)
+    print(f"{functions} functions, {arguments} arguments: parse {elapsed * 1000:8.1f} ms "
+        f"({elapsed / int(functions) * 1e6:.1f} us/function, median of {runs})")
+
+
+def _chunks(lines: int) -> str:
+    # one definition or statement per line: types, variables, objects, functions, calls & loops
+    chunks = [lambda i: f"type T{i} = {{a: int, b: boolean}};",
+        lambda i: f"let v{i} = {i} * 2 + 1;",
+        lambda i: f"let o{i}: T{i - 2} = {{a: v{i - 1} + 1, b: tr}};",
+        lambda i: f"function f{i}(x: int): int {{ let y = x + v{i - 2}; return y; }}",
+        lambda i: f"let c{i} = f{i - 1}(v{i - 3});",
+        lambda i: f"let w{i} = 0; while (w{i} < 3) {{ w{i} = w{i} + 1; }}"]
+    return "".join(chunks[i % len(chunks)](i) + "\n" for i in range(lines))
+
+
+def incremental(sizes: str = "1000,10000,100000", edits: str = "50"):
+    # keystroke latency: type & delete a digit in a literal in the middle of the file, as the file grows
+    from ajs_parser import AJSParser
+    from ajs_incremental import AJSDocument
+    parser = AJSParser()
+    for lines in map(int, sizes.split(",")):
+        data = _chunks(lines)
+        with parser.session():
+            start = time.perf_counter()
+            parser.load(data)
+            full = time.perf_counter() - start
+            expected = parser.outputs(parser.tables())
+
+        start = time.perf_counter()
+        document = AJSDocument(data, parser)
+        opened = time.perf_counter() - start
+        position = data.index(f"{lines // 2 // 6 * 6 + 1} * 2")  # literal of the middle `let v`
+        times, analyzed = [], []
+        for i in range(int(edits)):
+            start = time.perf_counter()
+            analyzed.append(document.edit(position, position, "7") if i % 2 == 0 else document.edit(position, position + 1, ""))
+            times.append(time.perf_counter() - start)
+
+        if document.error is not None or parser.outputs(document.tables()) != expected:
+            raise ValueError(f"[ERROR][BENCHMARK]: Different incremental result:\n"
+                f"# PROVIDED: {document.error or parser.outputs(document.tables())}\n"
+                f"# EXPECTED: {expected}")
+        print(f"{lines:>7} lines: full parse {full * 1000:9.1f} ms, open {opened * 1000:9.1f} ms, "
+            f"edit median {statistics.median(times) * 1000:6.2f} ms / max {max(times) * 1000:6.2f} ms, "
+            f"{max(analyzed)} items analyzed")
+
+
+def differential(edits: str = "200", seed: str = "0"):
+    # incremental results against a full parse: the test files opened, then random edits to each
+    import glob
+    import random
+    from ajs_parser import AJSParser
+    from ajs_incremental import AJSDocument
+    parser = AJSParser()
+
+    def full(text: str) -> tuple:
+        with parser.session():
+            try:
+                parser.load(text)
+            except ValueError as e:
+                return ("error", str(e))
+            return ("tables", parser.outputs(parser.tables()))
+
+    def analyzed(document: AJSDocument) -> tuple:
+        if document.error is not None:
+            return ("error", str(document.error))
+        return ("tables", parser.outputs(document.tables()))
+
+    generator = random.Random(int(seed))
+    pieces = [";", "{", "}", "/*", "*/", "\"", "\n", " ", "let q = 3;", "else", "$"]
+    different = 0
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "*", "*.ajs"))):
+        with open(path, encoding="UTF-8") as file:
+            text = file.read()
+        document = AJSDocument(text, parser)
+        mismatches = int(full(text) != analyzed(document))
+        for _ in range(int(edits)):
+            start = generator.randint(0, len(text))
+            end = min(len(text), start + generator.choice([0, 0, 1, 2, 5, 20]))
+            position = generator.randint(0, len(text))
+            replacement = generator.choice(pieces + [text[position:position + generator.randint(1, 30)]])  # moved source
+            text = text[:start] + replacement + text[end:]
+            document.edit(start, end, replacement)
+            mismatches += full(text) != analyzed(document)
+        different += mismatches
+        print(f"{os.path.relpath(path):<47} {int(edits) + 1:5} checks, {mismatches} different")
+    print(f">>> {different} RESULTS DIFFERENT FROM A FULL PARSE")
+    if different:
+        sys.exit(1)
+
+
+def objects(size: str = "5000"):
+    # memory & allocations: per value object, then parsing a large file
+    import tracemalloc
+    from ajs_parser import AJSParser
+    from ajs_object import AJSObject
+    from ajs_operator import AJSOperator
+    for name, kind in [("__dict__ object", _DictObject), ("AJSObject", AJSObject)]:
+        tracemalloc.start()
+        values = [kind("INT" if i % 2 else "Object", i) for i in range(100000)]
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:<16} {current / len(values):8.1f} bytes/value (value int included)")
+        del values
+
+    parser = AJSParser()
+    data = "type T = {a: int, b: float}; " + "".join(f"let v{i}: T = {{a: {i} * 2 + 1, b: {i}.5 - 1.0}}; "
+        f"let w{i} = v{i}.a + {i} * 3 - 'c'; if (w{i} >= {i} && tr) {{ w{i} = w{i} / 2; }}\n" for i in range(int(size)))
+    with parser.session():
+        tracemalloc.start()
+        start = time.perf_counter()
+        parser.load(data)
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.stop()
+    print(f"parse {len(data) / 2 ** 20:.1f} MiB: {elapsed * 1000:.1f} ms (traced), held {current / 2 ** 20:.1f} MiB in {blocks} blocks, "
+        f"peak {peak / 2 ** 20:.1f} MiB, {len(AJSOperator._instances)} operator objects")
+
+
+def operators(size: str = "1000000"):
+    # chain of binary operations: dispatch table vs formatting each operation for eval()
+    from decimal import Decimal
+    from ajs_object import AJSObject
+    from ajs_operator import AJSOperator
+    steps = [(AJSOperator("PLUS", "+"), "INT", 3), (AJSOperator("MINUS", "-"), "FLOAT", Decimal("0.5")),
+        (AJSOperator("PLUS", "+"), "CHARACTER", 97), (AJSOperator("MINUS", "-"), "FLOAT", Decimal("99.5"))]
+
+    start = time.perf_counter()
+    result = AJSObject("INT", 1)
+    for i in range(int(size)):
+        operator, type, value = steps[i % len(steps)]
+        result = operator.evaluate([result, AJSObject(type, value)])
+    table = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = 1
+    for i in range(int(size)):
+        operator, type, value = steps[i % len(steps)]
+        expected = eval(f"{expected} {operator.value} {value}")
+    evaluated = time.perf_counter() - start
+
+    if result.value != expected:
+        raise ValueError(f"[ERROR][BENCHMARK]: Different operation result:\n"
+            f"# PROVIDED: {result.value}\n"
+            f"# EXPECTED: {expected}")
+    print(f"dispatch table {int(size):>8} nodes: {table * 1000:10.1f} ms ({table / int(size) * 1e6:.2f} us/node)")
+    print(f"eval()         {int(size):>8} nodes: {evaluated * 1000:10.1f} ms ({evaluated / int(size) * 1e6:.2f} us/node)")
+    print(f"speedup: {evaluated / table:.1f}x")
+
+
+def _literals(rng, size: int) -> list:
+    # (token type, text) of numeric literals in every notation
+    notations = [("INTEGER", lambda: str(rng.randint(0, 10 ** 9))), ("INTEGER", lambda: f"0{rng.choice('xX')}{rng.randrange(1 << 48):x}"),
+        ("INTEGER", lambda: f"0{rng.randrange(1, 1 << 30):o}"), ("INTEGER", lambda: f"0{rng.choice('bB')}{rng.randrange(1, 1 << 20):b}"),
+        ("REAL", lambda: f"{rng.uniform(0, 1e6):.6f}"), ("REAL", lambda: f"{rng.uniform(0, 10):.3f}{rng.choice('eE')}{rng.randint(-30, 30)}")]
+    return [(kind, literal()) for kind, literal in (rng.choice(notations) for _ in range(size))]
+
+
+def numbers(size: str = "200000"):
+    # numeric literals: re-match of the token regex vs classification by characters, exact vs fast scientific REALs
+    import re
+    import random
+    from types import SimpleNamespace
+    from decimal import Decimal
+    from ajs_lexer import AJSLexer
+    literals = _literals(random.Random(0), int(size))
+
+    def rematch(kind, text):  # conversion before classification by characters
+        if kind == "REAL":
+            match = re.fullmatch(AJSLexer.real, text)
+            return Decimal(match.group(1)) if match.group(1) else float(match.group(2))
+        match = re.fullmatch(AJSLexer.integer, text)
+        for group, base in [(1, 2), (2, 8), (3, 16), (4, 10)]:
+            if match.group(group):
+                return int(match.group(group), base)
+
+    start = time.perf_counter()
+    expected = [rematch(kind, text) for kind, text in literals]
+    print(f"re-match    {len(literals):>8} literals: {(time.perf_counter() - start) * 1000:10.1f} ms")
+    data = "let v = 0;\n" + "".join(f"v = {text} + {text};\n" for _, text in literals)
+    for policy in ["exact", "fast"]:
+        lexer = AJSLexer(policy)
+        rules = {"INTEGER": lexer.t_INTEGER, "REAL": lexer.t_REAL}
+        tokens = [(rules[kind], SimpleNamespace(value=text)) for kind, text in literals]
+        start = time.perf_counter()
+        values = [rule(t).value for rule, t in tokens]
+        converted = time.perf_counter() - start
+        if policy == "exact" and [(type(value), value) for value in values] != [(type(value), value) for value in expected]:
+            raise ValueError("[ERROR][BENCHMARK]: Different numeric values")
+        start = time.perf_counter()
+        lexer.lexer.input(data)
+        count = sum(1 for _ in lexer.lexer)
+        lexed = time.perf_counter() - start
+        print(f"{policy:<11} {len(literals):>8} literals: {converted * 1000:10.1f} ms, lexer {count} tokens: {lexed * 1000:10.1f} ms")
+
+
+def _types(rng, size: int) -> str:
+    # many type definitions with basic & object fields, a variable of each
+    lines = []
+    for i in range(size):
+        fields = [f"f{j}: {rng.choice(['int', 'float', 'boolean', 'character'])}" for j in range(rng.randint(2, 6))]
+        if i:
+            fields += [f"o{j}: T{rng.randrange(i)}" for j in range(rng.randint(0, 2))]
+        lines.append(f"type T{i} = {{{', '.join(fields)}}}; let v{i}: T{i};")
+    return "\n".join(lines) + "\n"
+
+
+def _functions(rng, size: int) -> str:
+    # many functions with arguments, locals, blocks & calls to the previous ones
+    lines, arities = [], []
+    for i in range(size):
+        arities.append(rng.randint(1, 8))
+        callee = rng.randrange(i) if i else None
+        call = f"let c = f{callee}({', '.join(['s'] * arities[callee])}); " if i else ""
+        lines.append(f"function f{i}({', '.join(f'a{j}: int' for j in range(arities[i]))}): int {{ "
+            f"let s = {' + '.join(f'a{j}' for j in range(arities[i]))}; {call}"
+            f"if (s > {rng.randint(0, 100)}) {{ let t = s * 2; s = t - {rng.randint(1, 9)}; }} else {{ s = s + 1; }} "
+            f"while (s > 1000) {{ s = s / {rng.randint(2, 9)}; }} return s; }}")
+    return "\n".join(lines) + f"\nlet r = f{size - 1}({', '.join(['1'] * arities[-1])});\n"
+
+
+def _expressions(rng, size: int) -> str:
+    # long arithmetic, comparison & logical expressions over literals & previous variables
+    literals = [lambda: str(rng.randint(0, 999)), lambda: f"{rng.randint(0, 99)}.{rng.randint(0, 99)}",
+        lambda: f"'{rng.choice('abcdefghijklmnopqrstuvwxyz')}'"]
+    lines = ["let e0 = 1;"]
+    for i in range(1, size):
+        terms = [rng.choice(literals)() for _ in range(rng.randint(20, 60))]
+        arithmetic = f"e{rng.randrange(i)}" + "".join(f" {rng.choice(['+', '-'])} "
+            + (f"({term} * {rng.randint(1, 9)})" if rng.random() < 0.3 and term[0] != "'" else term) for term in terms)
+        lines.append(f"let e{i} = {arithmetic};")
+        if i % 4 == 0:
+            lines.append(f"let b{i} = e{i} < e{rng.randrange(i)} && !fl || e{i - 1} >= {rng.randint(0, 999)} && tr;")
+    return "\n".join(lines) + "\n"
+
+
+def _objects(rng, size: int) -> str:
+    # nested object types, literals, attribute assignments & reads
+    lines = ["type N0 = {a: int, b: float};", "type N1 = {x: N0, c: int};", "type N2 = {y: N1, d: boolean};", "type N3 = {z: N2, e: character};"]
+    for i in range(size):
+        lines.append(f"let o{i}: N3 = {{z: {{y: {{x: {{a: {rng.randint(0, 99)}, b: {rng.randint(0, 99)}.5}}, c: {rng.randint(0, 99)}}}, "
+            f"d: tr}}, e: '{rng.choice('abcdefghijklmnopqrstuvwxyz')}'}};")
+        lines.append(f"o{i}.z.y.x.a = o{i}.z.y.c + {rng.randint(0, 99)};")
+        lines.append(f"let r{i} = o{i}.z.y.x.a * 2 + o{i}.z.y.x.b;")
+    return "\n".join(lines) + "\n"
+
+
+# seeded corpus generators of the suite: (random generator, statements) -> AJS program
+CORPORA = {
+    "types": _types,
+    "functions": _functions,
+    "expressions": _expressions,
+    "objects": _objects
+}
+
+
+class _Replay:
+    # PLY lexer interface over tokens lexed before
+    def __init__(self, tokens: list):
+        self.token = iter(tokens + [None]).__next__
+
+
+def _syntax(parser):
+    # same LALR tables with no rule actions: the parser automaton alone
+    import copy
+    syntax = copy.copy(parser)
+    syntax.productions = [copy.copy(production) for production in parser.productions]
+    for production in syntax.productions:
+        production.callable = lambda p: None
+    return syntax
+
+
+def _commit() -> str:
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:  # no git
+        return "unknown"
+    return result.stdout.strip() or "unknown"
+
+
+def suite(size: str = "2000", runs: str = "5", seed: str = "0", output: str = None):
+    # phases timed separately on each generated corpus, results stored as JSON to compare commits
+    import gc
+    import json
+    import random
+    import platform
+    from ajs_parser import AJSParser
+    from ajs_compiler import AJSCompiler
+    from ajs_optimizer import AJSOptimizer
+    parser = AJSParser()
+    syntax = _syntax(parser.parser)
+    results = {"suite": "ajs", "commit": _commit(), "python": platform.python_version(), "machine": platform.machine(),
+        "seed": int(seed), "size": int(size), "runs": int(runs), "corpora": {}}
+
+    for name, generate in CORPORA.items():
+        data = generate(random.Random(f"{seed}:{name}"), int(size))
+        phases = {"lex": [], "parse": [], "semantic": [], "compile": [], "output": []}  # semantic: whole parse, then minus the automaton
+        for _ in range(int(runs)):
+            gc.collect()
+            start = time.perf_counter()
+            parser.lexer.lexer.lineno = 1
+            parser.lexer.lexer.input(data)
+            tokens = list(parser.lexer.lexer)
+            phases["lex"].append(time.perf_counter() - start)
+
+            gc.collect()
+            start = time.perf_counter()
+            syntax.parse(lexer=_Replay(tokens))
+            phases["parse"].append(time.perf_counter() - start)
+
+            with parser.session():
+                gc.collect()
+                start = time.perf_counter()
+                parser.parser.parse(lexer=_Replay(tokens))
+                phases["semantic"].append(time.perf_counter() - start)
+
+                gc.collect()
+                start = time.perf_counter()
+                AJSCompiler().compile(AJSOptimizer().optimize(parser.ast))
+                phases["compile"].append(time.perf_counter() - start)
+
+                gc.collect()
+                start = time.perf_counter()
+                parser.outputs(parser.tables())
+                phases["output"].append(time.perf_counter() - start)
+
+        times = {phase: min(times) for phase, times in phases.items()}  # least disturbed run
+        times["semantic"] = max(times["semantic"] - times["parse"], 0)  # rule actions only
+        results["corpora"][name] = {"bytes": len(data.encode("UTF-8")), "tokens": len(tokens),
+            "phases": {phase: round(elapsed * 1000, 3) for phase, elapsed in times.items()}}
+        print(f"{name:<11} {len(data) / 2 ** 20:6.2f} MiB {len(tokens):>8} tokens: "
+            + ", ".join(f"{phase} {ms:9.1f} ms" for phase, ms in results["corpora"][name]["phases"].items()))
+
+    output = output or f"suite-{results['commit']}.json"
+    with open(output, 'w', encoding="UTF-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"results: {output} (best of {runs})")
+
+
+def compare(old: str, new: str, threshold: str = "10"):
+    # phase times of two suite results: regressions beyond <threshold> % fail
+    import json
+    with open(old, encoding="UTF-8") as file:
+        before = json.load(file)
+    with open(new, encoding="UTF-8") as file:
+        after = json.load(file)
+    if (before["suite"], before["seed"], before["size"]) != (after["suite"], after["seed"], after["size"]):
+        raise ValueError(f"[ERROR][BENCHMARK]: Different suite corpora:\n"
+            f"# PROVIDED: {after['suite']}, seed {after['seed']}, size {after['size']}\n"
+            f"# EXPECTED: {before['suite']}, seed {before['seed']}, size {before['size']}")
+
+    regressions = 0
+    print(f"{before['commit']} -> {after['commit']}")
+    for name, corpus in after["corpora"].items():
+        for phase, ms in corpus["phases"].items():
+            previous = before["corpora"].get(name, {}).get("phases", {}).get(phase)
+            if previous is None:
+                continue
+            change = (ms - previous) / previous * 100 if previous else 0.0
+            slower = change > float(threshold)
+            regressions += slower
+            print(f"{name:<11} {phase:<8} {previous:10.1f} ms -> {ms:10.1f} ms {change:+7.1f} %{'  SLOWER' if slower else ''}")
+    print(f">>> {regressions} PHASES SLOWER THAN {threshold} %")
+    if regressions:
+        sys.exit(1)
+
+
+BENCHMARKS = {
+    "startup": startup,
+    "productions": productions,
+    "tokens": tokens,
+    "source": source,
+    "comments": comments,
+    "positions": positions,
+    "serve": serve,
+    "batch": batch,
+    "watch": watch,
+    "cache": cache,
+    "vm": vm,
+    "operators": operators,
+    "numbers": numbers,
+    "optimize": optimize,
+    "objects": objects,
+    "layouts": layouts,
+    "scopes": scopes,
+    "incremental": incremental,
+    "differential": differential,
+    "suite": suite,
+    "compare": compare
+}
+
+
+def main():
+    # CHECK BENCHMARK
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        raise ValueError(f"INCORRECT BENCHMARK:\n"
+            f"# PROVIDED: {sys.argv[1] if len(sys.argv) > 1 else None}\n"
+            f"# EXPECTED: {' || '.join(BENCHMARKS)}\n"
+            f"# USAGE: python3 ./benchmark.py <benchmark> [<argument> ...]")
+
+    BENCHMARKS[sys.argv[1]](*sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
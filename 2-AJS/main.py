@@ -1,40 +1,233 @@
 import sys
 import os
+import glob
+import time
+import hashlib
+import multiprocessing
+from contextlib import nullcontext
+from typing import Optional, Tuple, Union
 from ajs_lexer import AJSLexer
 from ajs_parser import AJSParser
+from ajs_profile import AJSProfiler, OFF
 
 
 def main():
+    # SERVER MODE
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        if len(sys.argv) != 3:
+            raise ValueError(f"INCORRECT ARGUMENT NUMBER:\n"
+                f"# PROVIDED: {len(sys.argv)}\n"
+                f"# EXPECTED: 3\n"
+                f"# USAGE: python3 ./main.py --serve <socket>\n"
+                f"# - <socket>: path of the Unix domain socket to listen on")
+        from ajs_server import AJSServer  # asyncio kept off the one-shot start path
+        AJSServer(sys.argv[2]).serve()
+        return
+
     # CHECK ARGUMENT NUMBER
     if len(sys.argv) < 3:
         raise ValueError(f"INCORRECT ARGUMENT NUMBER:\n"
             f"# PROVIDED: {len(sys.argv)}\n"
             f"# EXPECTED: 3\n"
-            f"# USAGE: python3 ./main.py <path>.ajs -<mode>\n"
-            f"# - <path>: path to an AJS file. Examples in ./2-AJS/tests\n"
-            f"# - <mode>: lex = lexer || par = parser")
+            f"# USAGE: python3 ./main.py <path>.ajs -<mode> [--jobs <N> || --watch] [--profile [<report>.json]] || python3 ./main.py --serve <socket>\n"
+            f"# - <path>: path to an AJS file, or a directory / glob of them. Examples in ./2-AJS/tests\n"
+            f"# - <mode>: lex = lexer || par = parser || run = parser & bytecode VM\n"
+            f"# - <N>: worker processes for directories / globs\n"
+            f"# - --watch: run again the files that change, until interrupted\n"
+            f"# - --profile: time per phase, grammar production & token, peak memory; summary or JSON <report>\n"
+            f"# - <socket>: path of the Unix domain socket to listen on")
     
     # CHECK MODE
-    if sys.argv[2] not in ["-lex", "-par"]:
+    if sys.argv[2] not in ["-lex", "-par", "-run"]:
         raise ValueError(f"INCORRECT MODE:\n"
             f"# PROVIDED: {sys.argv[2]}\n"
-            f"# EXPECTED: lex || par\n"
+            f"# EXPECTED: lex || par || run\n"
             f"# USAGE: python3 ./main.py ... -<mode>\n"
             f"# - ...\n"
-            f"# - <mode>: lex = lexer || par = parser")
+            f"# - <mode>: lex = lexer || par = parser || run = parser & bytecode VM")
     
+    # CHECK OPTIONS
+    jobs, profile = os.cpu_count(), None
+    options = sys.argv[3:]
+    while options:
+        option, options = options[0], options[1:]
+        if option == "--jobs":
+            jobs, options = (options[0], options[1:]) if options else (None, options)
+            if jobs is None or not jobs.isdigit() or int(jobs) < 1:
+                raise ValueError(f"INCORRECT JOBS NUMBER:\n"
+                    f"# PROVIDED: {jobs}\n"
+                    f"# EXPECTED: positive integer\n"
+                    f"# USAGE: python3 ./main.py ... --jobs <N>")
+            jobs = int(jobs)
+        elif option == "--profile":  # report file or summary
+            profile, options = (options[0], options[1:]) if options and options[0].endswith(".json") else ("", options)
+        elif option != "--watch":
+            raise ValueError(f"INCORRECT OPTION:\n"
+                f"# PROVIDED: {option}\n"
+                f"# EXPECTED: --jobs <N> || --watch, --profile [<report>.json]\n"
+                f"# USAGE: python3 ./main.py ... --jobs <N> || python3 ./main.py ... --watch\n"
+                f"# - ...\n"
+                f"# - <N>: worker processes, positive integer")
+    if "--watch" in sys.argv[3:] and "--jobs" in sys.argv[3:]:  # watch mode runs in one process
+        raise ValueError(f"INCORRECT OPTIONS:\n"
+            f"# PROVIDED: {' '.join(sys.argv[3:])}\n"
+            f"# EXPECTED: --jobs <N> || --watch\n"
+            f"# USAGE: python3 ./main.py ... --jobs <N> || python3 ./main.py ... --watch")
+
+    # PROFILE MODE
+    if profile is not None:
+        global PROFILER
+        PROFILER = AJSProfiler()  # analyzers built from now on are instrumented
+        PROFILER.start()
+        try:
+            dispatch(sys.argv[1], jobs)
+        finally:
+            PROFILER.stop()
+            if profile:
+                PROFILER.write(profile)
+                print(f">>> PROFILE REPORT {profile}", file=sys.stderr)
+            else:
+                print(PROFILER.summary(), file=sys.stderr)
+        return
+
+    dispatch(sys.argv[1], jobs)
+
+
+def dispatch(path: str, jobs: int):
+    # WATCH MODE
+    if "--watch" in sys.argv[3:]:
+        watch(path)
+        return
+
+    # BATCH MODE
+    if os.path.isdir(path) or glob.has_magic(path) or "--jobs" in sys.argv[3:]:
+        batch(path, jobs)
+        return
+
     # CHECK FILE EXTENSION
-    if os.path.splitext(sys.argv[1])[1] != ".ajs":
+    if os.path.splitext(path)[1] != ".ajs":
         raise ValueError(f"INCORRECT FILE EXTENSION:\n"
-            f"# PROVIDED: {os.path.splitext(sys.argv[1])[1]}\n"
+            f"# PROVIDED: {os.path.splitext(path)[1]}\n"
             f"# EXPECTED: .ajs")
     
-    if sys.argv[2] == "-par":  # lexer & parser
-        parser = AJSParser()
-        parser.parse(sys.argv[1])
+    run(path)
+
+
+# warm lexer & parser, built once per process
+ANALYZERS = {}
+# --profile: phases, grammar actions & tokens of the analyzers
+PROFILER = OFF
+
+
+def analyzer(kind: type):
+    if kind not in ANALYZERS:
+        with PROFILER.phase("setup"):  # lexer & parser tables
+            ANALYZERS[kind] = kind()
+        if PROFILER.enabled:
+            PROFILER.instrument(ANALYZERS[kind])
+            (ANALYZERS[kind].lexer if kind is AJSParser else ANALYZERS[kind]).cache.max_size = 0  # analyzed, not cached results
+    return ANALYZERS[kind]
+
+
+def run(path: str, output: Optional[str] = None):
+    if sys.argv[2] == "-run":  # lexer, parser & bytecode VM
+        parser = analyzer(AJSParser)
+        with parser.session():
+            parser.execute(path, output)
+    elif sys.argv[2] == "-par":  # lexer & parser
+        parser = analyzer(AJSParser)
+        with parser.session():  # nothing left over from a previous file
+            parser.parse(path, output)
     else:  # lexer
-        lexer = AJSLexer()
-        lexer.tokenize(sys.argv[1])
+        lexer = analyzer(AJSLexer)
+        lexer.tokenize(path, output)
+
+
+def root(pattern: str) -> str:
+    # directory of a directory / glob of files: outputs mirror the paths under it
+    if os.path.isdir(pattern):
+        return pattern
+    parts = []
+    for part in pattern.split(os.sep):
+        if glob.has_magic(part):
+            return os.sep.join(parts)
+        parts.append(part)
+    return os.path.dirname(pattern)  # a single file
+
+
+def output(path: str, directory: str) -> str:
+    # output files of `path`: its path under the root directory, without extension
+    return os.path.splitext(os.path.relpath(path, directory or "."))[0]
+
+
+def batch(pattern: str, jobs: int):
+    # every .ajs file under a directory / matching a glob, results in path order
+    directory = root(pattern)
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.ajs")
+    paths = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.splitext(path)[1] == ".ajs")
+    files = [(path, output(path, directory)) for path in paths]  # same file names in different directories
+
+    errors = 0
+    with nullcontext() if PROFILER.enabled else multiprocessing.Pool(min(jobs, max(len(paths), 1))) as pool:
+        # --profile: every file in this process
+        results = map(work, files) if pool is None else pool.imap(work, files, chunksize=max(1, min(64, len(paths) // (jobs * 4))))
+        for path, error in results:
+            if error is not None:  # gathered per file, the batch goes on
+                errors += 1
+                print(f">>> ERROR IN AJS FILE {path}\n{error}")
+    print(f">>> {len(paths)} AJS FILES, {errors} WITH ERRORS")
+    if errors:
+        sys.exit(1)
+
+
+def watch(pattern: str, interval: float = 0.1):
+    # poll the .ajs files under a directory / matching a glob, run the ones whose content changed in this process
+    directory = root(pattern)
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.ajs")
+    states = {}  # path -> ((modification time, size), content hash)
+    try:
+        while True:
+            paths = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.splitext(path)[1] == ".ajs")
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                    state = states.get(path)
+                    if state is not None and state[0] == (stat.st_mtime_ns, stat.st_size):  # untouched
+                        continue
+                    with open(path, "rb") as file:
+                        digest = hashlib.blake2b(file.read(), digest_size=16).digest()
+                except FileNotFoundError:  # removed meanwhile
+                    continue
+                states[path] = ((stat.st_mtime_ns, stat.st_size), digest)
+                if state is not None and state[1] == digest:  # saved again, same content
+                    continue
+
+                start = time.perf_counter()
+                _, error = work((path, output(path, directory)))
+                if error is None:
+                    print(f">>> AJS FILE {path} ({(time.perf_counter() - start) * 1000:.1f} ms)", flush=True)
+                else:
+                    print(f">>> ERROR IN AJS FILE {path}\n{error}", flush=True)
+            for path in states.keys() - set(paths):
+                del states[path]
+                print(f">>> REMOVED AJS FILE {path}", flush=True)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print(f">>> {len(states)} AJS FILES WATCHED")
+
+
+def work(file: Tuple[str, str]) -> Tuple[str, Union[str, None]]:
+    # worker process: (path, output files under ./output/) -> (path, error)
+    path, stem = file
+    try:
+        run(path, stem)
+    except (ValueError, FileNotFoundError) as e:  # analysis errors
+        return (path, str(e))
+    except Exception as e:
+        return (path, f"{type(e).__name__}: {e}")
+    return (path, None)
 
 
 if __name__ == "__main__":